@@ -1 +1 @@
-{'name': 'Energy Broker UK', 'version': '19.0.1.0.0', 'summary': 'End-to-end UK energy brokerage workflow: LOA, tenders, responses, contracts, renewals', 'description': 'Energy Broker UK: Manage Letters of Authority (LOA), create supplier price requests with meters, collect supplier responses, compare offers, and create customer contracts with renewal reminders. Includes a printable supplier comparison report.', 'category': 'Sales', 'author': 'Your Broker Ltd', 'website': 'https://yourbroker.co.uk', 'license': 'OPL-1', 'depends': ['base', 'mail', 'product', 'contacts', 'sign', 'crm', 'sale', 'documents'], 'data': ['security/security.xml', 'security/ir.model.access.csv', 'data/sequence.xml', 'data/cron.xml', 'views/site_views.xml', 'views/loa_views.xml', 'views/crm_lead_views.xml', 'views/price_request_views.xml', 'views/price_response_views.xml', 'views/contract_views.xml', 'views/contract_ext_views.xml', 'views/partner_actions.xml', 'views/energy_settings_views.xml', 'views/price_request_actions.xml', 'views/product_meter_views.xml', 'views/variant_meter_views.xml', 'views/loa_actions.xml', 'views/report_templates.xml', 'report/report.xml', 'views/menus.xml', 'views/reconciliation_views.xml', 'data/cron_contract_alerts.xml', 'data/cron_sign_sync.xml', 'views/commission_config_views.xml'], 'installable': True, 'application': True}
\ No newline at end of file
+{'name': 'Energy Broker UK', 'version': '19.0.1.3.0', 'summary': 'End-to-end UK energy brokerage workflow: LOA, tenders, responses, contracts, renewals', 'description': 'Energy Broker UK: Manage Letters of Authority (LOA), create supplier price requests with meters, collect supplier responses, compare offers, and create customer contracts with renewal reminders. Includes a printable supplier comparison report.', 'category': 'Sales', 'author': 'Your Broker Ltd', 'website': 'https://yourbroker.co.uk', 'license': 'OPL-1', 'depends': ['base', 'mail', 'product', 'contacts', 'sign', 'crm', 'sale', 'documents'], 'external_dependencies': {'python': ['numpy']}, 'data': ['security/security.xml', 'security/ir.model.access.csv', 'data/sequence.xml', 'data/cron.xml', 'views/site_views.xml', 'views/loa_views.xml', 'views/crm_lead_views.xml', 'views/price_request_views.xml', 'views/price_response_views.xml', 'views/contract_views.xml', 'views/contract_ext_views.xml', 'views/partner_actions.xml', 'views/energy_settings_views.xml', 'views/price_request_actions.xml', 'views/product_meter_views.xml', 'views/variant_meter_views.xml', 'views/loa_actions.xml', 'views/report_templates.xml', 'report/report.xml', 'views/menus.xml', 'views/reconciliation_views.xml', 'data/cron_contract_alerts.xml', 'data/cron_sign_sync.xml', 'views/commission_config_views.xml', 'views/hh_import_views.xml', 'views/meter_import_views.xml', 'views/reconciliation_import_views.xml', 'views/hh_summary_views.xml', 'data/cron_hh_summary.xml', 'views/hh_quality_views.xml', 'data/cron_hh_quality.xml', 'data/cron_hh_rollup.xml', 'data/cron_pricing.xml', 'data/cron_quotes.xml', 'views/tender_template_views.xml', 'views/partner_views.xml', 'views/supplier_pricing_views.xml', 'views/tender_dispatch_views.xml', 'data/cron_tenders.xml', 'views/renewal_views.xml', 'data/cron_renewals.xml', 'data/cron_commission.xml'], 'installable': True, 'application': True}
\ No newline at end of file
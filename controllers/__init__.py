@@ -0,0 +1 @@
+from . import hh_chart
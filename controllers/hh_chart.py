@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from werkzeug.exceptions import BadRequest
+
+from odoo import fields, http
+from odoo.http import request
+
+from ..models.hh_chart import CHART_POINTS, MAX_CHART_DAYS, MAX_CHART_POINTS
+
+CHART_MODELS = ('product.product', 'customer.site')
+
+
+class HHChartController(http.Controller):
+
+    @http.route('/energy_broker_uk/hh_chart/<string:model>/<int:res_id>', type='http', auth='user',
+                methods=['GET'], readonly=True)
+    def hh_chart(self, model, res_id, date_from=None, date_to=None, points=None):
+        """Load series and heatmap of a meter or site as JSON, served from the daily rollup tiles.
+
+        ``date_from``/``date_to`` (YYYY-MM-DD, end exclusive) default to the
+        last year; ``points`` caps the number of series buckets.
+        """
+        if model not in CHART_MODELS:
+            raise request.not_found()
+        record = request.env[model].browse(res_id).exists()
+        if not record:
+            raise request.not_found()
+        record.check_access('read')
+        meter = record._get_chart_meter()
+        if not meter:
+            raise request.not_found()
+        try:
+            date_to = fields.Date.to_date(date_to) or fields.Date.context_today(record) + timedelta(days=1)
+            date_from = fields.Date.to_date(date_from) or date_to - timedelta(days=365)
+            points = min(int(points or CHART_POINTS), MAX_CHART_POINTS)
+        except ValueError as e:
+            raise BadRequest(str(e))
+        if not 0 < (date_to - date_from).days <= MAX_CHART_DAYS or points < 1:
+            raise BadRequest('Invalid date range or point count')
+        data = request.env['energy.hh.day.rollup']._chart_data(meter.id, date_from, date_to, points)
+        return request.make_json_response(data)
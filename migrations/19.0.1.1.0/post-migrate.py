@@ -0,0 +1,9 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Bucket the existing HH reads, which the install-time backfill never saw on upgraded databases."""
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['energy.hh.day.rollup']._rebuild_buckets()
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from odoo import api, SUPERUSER_ID
+
+from odoo.addons.energy_broker_uk.models.hh_read import settlement_day_bounds
+
+
+def migrate(cr, version):
+    """Rebuild buckets created before they carried chart tiles, so load charts cover existing history.
+
+    One meter at a time over its own untiled days, which can reach further
+    back than the install-time backfill.
+    """
+    if not version:
+        return
+    cr.execute("""
+        SELECT meter_product_id, MIN(day), MAX(day)
+          FROM energy_hh_day_rollup
+         WHERE slot_kwh IS NULL
+      GROUP BY meter_product_id
+    """)
+    Rollup = api.Environment(cr, SUPERUSER_ID, {})['energy.hh.day.rollup']
+    for meter_id, day_from, day_to in cr.fetchall():
+        Rollup._update_buckets([meter_id], settlement_day_bounds(day_from)[0],
+                               settlement_day_bounds(day_to + timedelta(days=1))[0])
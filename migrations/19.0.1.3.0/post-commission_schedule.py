@@ -0,0 +1,5 @@
+def migrate(cr, version):
+    """Have the commission cron rebuild expected entries on the monthly schedule."""
+    if not version:
+        return
+    cr.execute("UPDATE customer_contract SET commission_dirty = true")
@@ -0,0 +1,13 @@
+def migrate(cr, version):
+    """Point the Jellyfish supplier created before pricing adapters existed at the Jellyfish adapter.
+
+    Pricing now only calls suppliers with a pricing_adapter, so without this
+    the existing partner would silently stop being priced after upgrade.
+    """
+    if not version:
+        return
+    cr.execute("""
+        UPDATE res_partner
+           SET pricing_adapter = 'jellyfish'
+         WHERE pricing_adapter IS NULL AND name = 'Jellyfish Energy'
+    """)
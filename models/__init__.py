@@ -6,5 +6,24 @@ from . import lead
 from . import product_meter
 from . import contract_ext
 from . import commission_config
+from . import reconciliation
+from . import commission_ledger
+from . import reconciliation_import
 from . import hh_read
+from . import hh_day
+from . import hh_summary
+from . import hh_quality
+from . import hh_rollup
+from . import hh_chart
 from . import tariff
+from . import tariff_costing
+from . import hh_import
+from . import sign_request
+from . import supplier_pricing
+from . import offer_ranking
+from . import quote_dispatch
+from . import tender_export
+from . import tender_dispatch
+from . import meter_import
+from . import meter_lookup
+from . import renewal
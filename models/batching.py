@@ -0,0 +1,20 @@
+from odoo.tools import split_every
+
+# Records written per batch by the daily housekeeping crons.
+CRON_BATCH_SIZE = 1000
+
+
+def iter_cron_batches(records, batch_size=CRON_BATCH_SIZE):
+    """Yield ``records`` in batches, committing progress after each one when run by ir.cron.
+
+    Stops early once the cron's time budget is spent. Callers select their
+    work with a domain that excludes already processed records, so the next
+    run resumes where this one stopped instead of starting from zero.
+    """
+    in_cron = bool(records.env.context.get('cron_id'))
+    remaining = len(records)
+    for batch in split_every(batch_size, records.ids, records.browse):
+        yield batch
+        remaining -= len(batch)
+        if in_cron and not records.env['ir.cron']._commit_progress(len(batch), remaining=remaining):
+            break
@@ -0,0 +1,147 @@
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+from .batching import iter_cron_batches
+
+# Contract states that earn no commission.
+NO_COMMISSION_STATES = ('cancelled', 'cot_cancelled')
+
+
+def expected_schedule(annual_commission, start_date, end_date, upfront_amount, years=None):
+    """Split a contract's commission into ``[(date, amount)]`` instalments.
+
+    ``years`` defaults to the contract term rounded to whole years. The
+    upfront amount falls on the start date; the rest of the term's
+    commission accrues in equal monthly parts from the start date, so any
+    statement month within the term has an expectation to be checked against.
+    """
+    if not annual_commission or not start_date or not end_date or end_date < start_date:
+        return []
+    if not years:
+        term = relativedelta(end_date + relativedelta(days=1), start_date)
+        years = max(1, round(term.years + term.months / 12.0))
+    total = annual_commission * years
+    upfront = min(upfront_amount or 0.0, total)
+    schedule = [(start_date, upfront)] if upfront else []
+    months = years * 12
+    remainder = (total - upfront) / months
+    if remainder:
+        schedule += [(start_date + relativedelta(months=k), remainder) for k in range(months)]
+    return schedule
+
+
+class EnergyCommissionEntry(models.Model):
+    """Expected, received or paid-out commission for one contract on one date."""
+    _name = 'energy.commission.entry'
+    _description = 'Commission Ledger Entry'
+    _order = 'date, id'
+
+    contract_id = fields.Many2one('customer.contract', required=True, index=True, ondelete='cascade')
+    partner_id = fields.Many2one(related='contract_id.partner_id', store=True, string='Customer')
+    supplier_id = fields.Many2one(related='contract_id.supplier_id', store=True, index=True)
+    user_id = fields.Many2one(related='contract_id.lead_id.user_id', store=True, string='Broker', index=True)
+    date = fields.Date(required=True, index=True)
+    entry_type = fields.Selection([
+        ('expected', 'Expected'),
+        ('received', 'Received'),
+        ('paid', 'Paid Out'),
+    ], required=True, index=True)
+    expected_amount = fields.Float()
+    received_amount = fields.Float()
+    paid_amount = fields.Float(string='Paid Out')
+    variance = fields.Float(help='Received minus expected; summed over a period it is the shortfall or surplus.')
+    supplier_line_id = fields.Many2one('supplier.reconciliation.line', ondelete='cascade', index='btree_not_null')
+    broker_line_id = fields.Many2one('broker.reconciliation.line', ondelete='cascade', index='btree_not_null')
+
+
+class CustomerContract(models.Model):
+    _inherit = 'customer.contract'
+
+    commission_entry_ids = fields.One2many('energy.commission.entry', 'contract_id', string='Commission Ledger')
+    commission_dirty = fields.Boolean(compute='_compute_commission_dirty', store=True, readonly=False, index=True,
+                                      copy=False, help='Expected commission entries need rebuilding.')
+
+    @api.depends('full_commission', 'commission_first_payment', 'start_date', 'end_date', 'state',
+                 'commission_rule_id.year_duration')
+    def _compute_commission_dirty(self):
+        self.commission_dirty = True
+
+    def cron_rebuild_commission_ledger(self):
+        dirty = self.search([('commission_dirty', '=', True)])
+        for batch in iter_cron_batches(dirty):
+            batch._rebuild_commission_ledger()
+
+    def _rebuild_commission_ledger(self):
+        """Replace the expected entries of ``self`` in one unlink and one batched create."""
+        Entry = self.env['energy.commission.entry']
+        Entry.search([('contract_id', 'in', self.ids), ('entry_type', '=', 'expected')]).unlink()
+        vals_list = []
+        for rec in self:
+            if rec.state in NO_COMMISSION_STATES:
+                continue
+            for date, amount in expected_schedule(rec.full_commission, rec.start_date, rec.end_date,
+                                                  rec.commission_first_payment,
+                                                  rec.commission_rule_id.year_duration):
+                vals_list.append({
+                    'contract_id': rec.id,
+                    'date': date,
+                    'entry_type': 'expected',
+                    'expected_amount': amount,
+                    'variance': -amount,
+                })
+        Entry.create(vals_list)
+        self.write({'commission_dirty': False})
+
+
+class ReconciliationLedgerMixin(models.AbstractModel):
+    _name = 'energy.reconciliation.ledger.mixin'
+    _description = 'Reconciliation Line Ledger Sync'
+
+    # set by each reconciliation line model
+    _ledger_entry_type = None
+    _ledger_amount_field = None
+    _ledger_link_field = None
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._sync_commission_entries()
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'contract_id', 'date', self._ledger_amount_field} & set(vals):
+            self._sync_commission_entries()
+        return res
+
+    def _sync_commission_entries(self):
+        Entry = self.env['energy.commission.entry'].sudo()
+        Entry.search([(self._ledger_link_field, 'in', self.ids)]).unlink()
+        amount_field = 'received_amount' if self._ledger_entry_type == 'received' else 'paid_amount'
+        Entry.create([{
+            'contract_id': line.contract_id.id,
+            'date': line.date,
+            'entry_type': self._ledger_entry_type,
+            amount_field: line[self._ledger_amount_field],
+            'variance': line[self._ledger_amount_field] if self._ledger_entry_type == 'received' else 0.0,
+            self._ledger_link_field: line.id,
+        } for line in self])
+
+
+class SupplierReconciliationLine(models.Model):
+    _name = 'supplier.reconciliation.line'
+    _inherit = ['supplier.reconciliation.line', 'energy.reconciliation.ledger.mixin']
+
+    _ledger_entry_type = 'received'
+    _ledger_amount_field = 'com_amount'
+    _ledger_link_field = 'supplier_line_id'
+
+
+class BrokerReconciliationLine(models.Model):
+    _name = 'broker.reconciliation.line'
+    _inherit = ['broker.reconciliation.line', 'energy.reconciliation.ledger.mixin']
+
+    _ledger_entry_type = 'paid'
+    _ledger_amount_field = 'comm_amount'
+    _ledger_link_field = 'broker_line_id'
@@ -1,6 +1,11 @@
 from odoo import models, fields, api, _
 from dateutil.relativedelta import relativedelta
 
+from .batching import iter_cron_batches
+
+# Days before contract end at which the alert flag is raised.
+ALERT_DAYS = (90, 60, 30)
+
 class CustomerContractExt(models.Model):
     _inherit = "customer.contract"
 
@@ -23,10 +28,12 @@ class CustomerContractExt(models.Model):
 
     # Commission fields
     supplier_commission = fields.Float(compute="_compute_supplier_commission", store=True)
-    commission_first_payment = fields.Float()
+    commission_first_payment = fields.Float(compute="_compute_full_commission", store=True, readonly=False)
     full_commission = fields.Float(compute="_compute_full_commission", store=True)
     commission_amount_total = fields.Float(compute="_compute_commission_amount_total", store=True)
     commission_to_pay = fields.Float(compute="_compute_commission_to_pay", store=True)
+    supplier_reconcile_ids = fields.One2many("supplier.reconciliation.line", "contract_id", string="Supplier Reconciliations")
+    broker_reconcile_ids = fields.One2many("broker.reconciliation.line", "contract_id", string="Broker Reconciliations")
 
     # Alerts
     alert = fields.Boolean(default=False)
@@ -43,7 +50,8 @@ class CustomerContractExt(models.Model):
     signer_partner_id = fields.Many2one("res.partner", string="Signer")
     sign_completed_on = fields.Datetime()
 
-    @api.depends("price_response_id", "price_response_id.line_ids.annual_usage_kwh", "uplift_p_per_kwh", "commission_rule_id")
+    @api.depends("price_response_id", "price_response_id.line_ids.annual_usage_kwh", "uplift_p_per_kwh",
+                 "commission_rule_id", "commission_rule_id.supplier_percent")
     def _compute_supplier_commission(self):
         for rec in self:
             usage = 0.0
@@ -56,43 +64,44 @@ class CustomerContractExt(models.Model):
             else:
                 rec.supplier_commission = base
 
-    @api.depends("supplier_commission", "commission_rule_id")
+    @api.depends("supplier_commission", "commission_rule_id", "commission_rule_id.broker_split_percent",
+                 "commission_rule_id.upfront_percent")
     def _compute_full_commission(self):
         for rec in self:
             rule = rec.commission_rule_id
             broker_split = (rule.broker_split_percent / 100.0) if (rule and rule.broker_split_percent) else 1.0
             rec.full_commission = (rec.supplier_commission or 0.0) * broker_split
-            # Derive first payment from upfront % if not already set
-            if rule and rule.upfront_percent is not None:
-                rec.commission_first_payment = (rec.full_commission or 0.0) * (rule.upfront_percent / 100.0)
+            # Derive first payment from upfront % unless the rule has none
+            if rule:
+                rec.commission_first_payment = (rec.full_commission or 0.0) * ((rule.upfront_percent or 0.0) / 100.0)
+            else:
+                rec.commission_first_payment = rec.commission_first_payment or 0.0
 
+    @api.depends("full_commission", "supplier_reconcile_ids.com_amount")
     def _compute_commission_amount_total(self):
         for rec in self:
-            # If reconciliation models are present, try summing; otherwise just mirror full_commission
-            total = rec.full_commission or 0.0
-            try:
-                if hasattr(rec, supplier_reconcile_ids):
-                    total = sum(l.com_amount for l in rec.supplier_reconcile_ids)
-            except Exception:
-                pass
-            rec.commission_amount_total = total
+            # received so far once statements arrive, the expected full commission until then
+            if rec.supplier_reconcile_ids:
+                rec.commission_amount_total = sum(rec.supplier_reconcile_ids.mapped("com_amount"))
+            else:
+                rec.commission_amount_total = rec.full_commission or 0.0
 
+    @api.depends("supplier_commission", "commission_first_payment", "broker_reconcile_ids.comm_amount")
     def _compute_commission_to_pay(self):
         for rec in self:
-            paid = 0.0
-            try:
-                if hasattr(rec, broker_reconcile_ids):
-                    paid = sum(l.comm_amount for l in rec.broker_reconcile_ids)
-            except Exception:
-                paid = 0.0
+            paid = sum(rec.broker_reconcile_ids.mapped("comm_amount"))
             rec.commission_to_pay = (rec.supplier_commission or 0.0) - (rec.commission_first_payment or 0.0) - paid
 
     def cron_contract_alerts(self):
         today = fields.Date.today()
-        contracts = self.search([("end_date", "!=", False)])
-        for c in contracts:
-            days = (c.end_date - today).days if c.end_date else 0
-            c.alert = days in (90, 60, 30)
+        targets = [today + relativedelta(days=d) for d in ALERT_DAYS]
+        # only touch contracts whose flag actually changes
+        to_clear = self.search([("alert", "=", True), ("end_date", "!=", False), ("end_date", "not in", targets)])
+        to_raise = self.search([("alert", "=", False), ("end_date", "in", targets)])
+        for batch in iter_cron_batches(to_clear):
+            batch.write({"alert": False})
+        for batch in iter_cron_batches(to_raise):
+            batch.write({"alert": True})
 
     def action_send_for_signature(self):
         self.ensure_one()
@@ -129,26 +138,35 @@ class CustomerContractExt(models.Model):
         }
 
     def cron_sync_sign_status(self):
-        for rec in self.search([("sign_request_id", "!=", False)]):
-            req = rec.sign_request_id
-            status = getattr(req, "state", False) or getattr(req, "status", False)
+        # safety net for state changes the sign.request write hook missed
+        self.search([
+            ("sign_request_id", "!=", False),
+            ("sign_status", "not in", ("signed", "refused", "cancelled")),
+        ])._sync_sign_status()
+
+    def _sync_sign_status(self):
+        by_status = self.grouped(lambda c: getattr(c.sign_request_id, "state", False) or getattr(c.sign_request_id, "status", False))
+        signed = self.browse()
+        for status, contracts in by_status.items():
             if status in ("completed", "signed"):
-                rec.sign_status = "signed"
-                rec.sign_completed_on = fields.Datetime.now()
-                att = self.env["ir.attachment"].search([
-                    ("res_model", "=", "sign.request"),
-                    ("res_id", "=", req.id),
-                    ("mimetype", "ilike", "pdf")
-                ], order="id desc", limit=1)
-                if att:
-                    rec.pdf_attachment_id = att
-                if rec.state in ("draft", "doc_pending", "sale_agreed"):
-                    rec.state = "confirmed"
+                signed |= contracts
             elif status in ("refused", "rejected"):
-                rec.sign_status = "refused"
-                if rec.state not in ("cancelled", "cot_cancelled"):
-                    rec.state = "query"
-            elif status in ("cancel", "cancelled"):
-                rec.sign_status = "cancelled"
+                contracts.write({"sign_status": "refused"})
+                contracts.filtered(lambda c: c.state not in ("cancelled", "cot_cancelled")).write({"state": "query"})
+            elif status in ("cancel", "canceled", "cancelled"):
+                contracts.write({"sign_status": "cancelled"})
             else:
-                rec.sign_status = "pending"
+                contracts.filtered(lambda c: c.sign_status != "pending").write({"sign_status": "pending"})
+        if not signed:
+            return
+        signed.write({"sign_status": "signed", "sign_completed_on": fields.Datetime.now()})
+        signed.filtered(lambda c: c.state in ("draft", "doc_pending", "sale_agreed")).write({"state": "confirmed"})
+        latest_pdf = dict(self.env["ir.attachment"]._read_group([
+            ("res_model", "=", "sign.request"),
+            ("res_id", "in", signed.sign_request_id.ids),
+            ("mimetype", "ilike", "pdf"),
+        ], ["res_id"], ["id:max"]))
+        for rec in signed:
+            att_id = latest_pdf.get(rec.sign_request_id.id)
+            if att_id:
+                rec.pdf_attachment_id = att_id
@@ -0,0 +1,168 @@
+import warnings
+from datetime import timedelta
+
+import numpy as np
+from markupsafe import Markup, escape
+
+from odoo import models, fields, api, _
+
+# Points returned by default for the load series.
+CHART_POINTS = 1000
+MAX_CHART_POINTS = 5000
+# Longest date range the chart endpoint serves.
+MAX_CHART_DAYS = 5 * 366
+# Days shown by the chart embedded on meter and site forms.
+CHART_FORM_DAYS = 365
+
+HALF_HOUR = np.timedelta64(30, 'm')
+
+
+def downsample_minmax(values, points):
+    """Reduce ``values`` to at most ``points`` equal buckets.
+
+    Returns ``(bucket_size, min, max, mean)`` with one array element per
+    bucket. Min/max per bucket keeps peaks that LTTB-style sampling can
+    drop. NaN (missing reads) is ignored; an all-missing bucket gives NaN.
+    """
+    n = len(values)
+    size = max(1, -(-n // max(points, 1)))
+    padded = np.full(-(-n // size) * size, np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(-1, size)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return size, np.nanmin(blocks, axis=1), np.nanmax(blocks, axis=1), np.nanmean(blocks, axis=1)
+
+
+def _json_values(values, digits=3):
+    out = np.round(values, digits).astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def svg_load_chart(matrix, width=720):
+    """Render a kW min/max band over a weekly day x half-hour heatmap as inline SVG."""
+    if not np.isfinite(matrix).any():
+        return Markup('<p class="text-muted">%s</p>') % _('No half-hourly reads in this period.')
+    size, low, high, mean = downsample_minmax(matrix.ravel() * 2.0, width // 2)
+    low, high, mean = (np.nan_to_num(a) for a in (low, high, mean))
+    top = max(high.max(), 1e-9)
+    band_height = 120
+    x = np.linspace(0, width, len(low))
+    y = lambda v: band_height - v / top * (band_height - 4)
+    band = ' '.join('%.1f,%.1f' % p for p in zip(np.concatenate([x, x[::-1]]), np.concatenate([y(high), y(low)[::-1]])))
+    line = ' '.join('%.1f,%.1f' % p for p in zip(x, y(mean)))
+
+    weeks = -(-len(matrix) // 7)
+    padded = np.full((weeks * 7, 48), np.nan)
+    padded[:len(matrix)] = matrix
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        heat = np.nanmean(padded.reshape(weeks, 7, 48), axis=1)
+    heat_top = max(np.nanmax(heat), 1e-9)
+    cell_w, cell_h = width / weeks, 3
+    cells = []
+    for (week, slot), value in np.ndenumerate(heat):
+        if np.isnan(value):
+            fill = '#eeeeee'
+        else:
+            shade = int(230 - 200 * value / heat_top)
+            fill = 'rgb(%d,%d,255)' % (shade, shade)
+        cells.append('<rect x="%.1f" y="%d" width="%.2f" height="%d" fill="%s"/>'
+                     % (week * cell_w, band_height + 10 + slot * cell_h, cell_w + 0.3, cell_h, fill))
+    height = band_height + 10 + 48 * cell_h
+    return Markup(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">'
+        '<title>%s</title>'
+        '<polygon points="%s" fill="#9ecae1"/><polyline points="%s" fill="none" stroke="#08519c"/>%s'
+        '<text x="2" y="10" font-size="10">%s</text></svg>'
+    ) % (width, height, width, height, _('Load profile'), band, line, Markup(''.join(cells)),
+         escape(_('Peak %.1f kW') % top))
+
+
+def _compute_load_chart(records):
+    """Set ``hh_load_chart`` on meters or sites to the SVG of their last CHART_FORM_DAYS."""
+    date_to = fields.Date.context_today(records) + timedelta(days=1)
+    date_from = date_to - timedelta(days=CHART_FORM_DAYS)
+    Rollup = records.env['energy.hh.day.rollup']
+    for rec in records:
+        meter = rec._origin._get_chart_meter() if rec._origin.id and rec.meter_type == 'hh' else None
+        rec.hh_load_chart = svg_load_chart(Rollup._load_tiles(meter.id, date_from, date_to)) if meter else False
+
+
+class EnergyHHDayRollup(models.Model):
+    _inherit = 'energy.hh.day.rollup'
+
+    @api.model
+    def _load_tiles(self, meter_id, date_from, date_to):
+        """Return a ``(days, 48)`` matrix of mean kWh per local half-hour over [date_from, date_to).
+
+        Days without reads are rows of NaN. Built from the daily rollup tiles
+        in one query, never from energy.hh.read.
+        """
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT day, slot_kwh
+              FROM energy_hh_day_rollup
+             WHERE meter_product_id = %s AND day >= %s AND day < %s AND slot_kwh IS NOT NULL
+        """, (meter_id, date_from, date_to))
+        matrix = np.full((max((date_to - date_from).days, 0), 48), np.nan)
+        for day, slot_kwh in self.env.cr.fetchall():
+            matrix[(day - date_from).days] = np.array(slot_kwh, dtype=float)
+        return matrix
+
+    @api.model
+    def _chart_data(self, meter_id, date_from, date_to, points=CHART_POINTS):
+        """Downsampled kW series and day x half-hour kWh heatmap for one meter, JSON-ready.
+
+        Timestamps are UK local wall-clock times of each bucket's start.
+        """
+        matrix = self._load_tiles(meter_id, date_from, date_to)
+        size, low, high, mean = downsample_minmax(matrix.ravel() * 2.0, points)
+        starts = np.datetime64(date_from, 'm') + np.arange(len(low)) * size * HALF_HOUR
+        return {
+            'meter_id': meter_id,
+            'date_from': fields.Date.to_string(date_from),
+            'date_to': fields.Date.to_string(date_to),
+            'series': {
+                'resolution_minutes': 30 * size,
+                't': np.datetime_as_string(starts, unit='m').tolist(),
+                'min_kw': _json_values(low),
+                'max_kw': _json_values(high),
+                'mean_kw': _json_values(mean),
+            },
+            'heatmap': {
+                'days': [fields.Date.to_string(date_from + timedelta(days=k)) for k in range(len(matrix))],
+                'kwh': [_json_values(row) for row in matrix],
+            },
+        }
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    hh_load_chart = fields.Html(string='Load Profile', compute='_compute_hh_load_chart', sanitize=False)
+
+    def _get_chart_meter(self):
+        self.ensure_one()
+        return self if self.is_energy_meter else self.browse()
+
+    @api.depends('hh_last_read')
+    def _compute_hh_load_chart(self):
+        _compute_load_chart(self)
+
+
+class CustomerSite(models.Model):
+    _inherit = 'customer.site'
+
+    hh_load_chart = fields.Html(string='Load Profile', compute='_compute_hh_load_chart', sanitize=False)
+
+    def _get_chart_meter(self):
+        self.ensure_one()
+        if not self.meter_key:
+            return self.env['product.product']
+        return self.env['product.product'].search([('meter_key', '=', self.meter_key)], limit=1)
+
+    @api.depends('hh_last_read')
+    def _compute_hh_load_chart(self):
+        _compute_load_chart(self)
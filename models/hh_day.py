@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+
+from odoo import models, fields, api
+
+from .hh_read import HALF_HOUR, HHSeries, empty_series, settlement_day_bounds, settlement_slot
+
+# Day rows merged per INSERT ... ON CONFLICT statement.
+MERGE_CHUNK_SIZE = 1000
+# Quality code of a slot with no read.
+MISSING = '-'
+
+
+class EnergyHHDay(models.Model):
+    """One row per meter and UK settlement day holding packed slot arrays.
+
+    ``kwh_values`` and ``kvarh_values`` are ``float8[]`` columns managed in
+    SQL (see ``init``) with one element per settlement period and NULL for a
+    missing read; ``quality_codes`` holds one A/E/S character per slot.
+    """
+    _name = 'energy.hh.day'
+    _description = 'Half-Hourly Reads per Day'
+    _order = 'meter_product_id, day'
+
+    meter_product_id = fields.Many2one('product.product', string='Meter', required=True, ondelete='cascade')
+    day = fields.Date(string='Settlement Day', required=True)
+    period_count = fields.Integer(string='Periods', default=48)
+    quality_codes = fields.Char(string='Quality')
+    total_kwh = fields.Float(string='Total kWh')
+
+    _meter_day_unique = models.Constraint(
+        'UNIQUE(meter_product_id, day)',
+        'Only one packed read row is allowed per meter and day.',
+    )
+
+    def init(self):
+        self.env.cr.execute("""
+            ALTER TABLE energy_hh_day
+                ADD COLUMN IF NOT EXISTS kwh_values float8[],
+                ADD COLUMN IF NOT EXISTS kvarh_values float8[]
+        """)
+
+    @api.model
+    def _bulk_merge(self, rows):
+        """Merge ``(meter_product_id, ts_utc, kwh, kvarh, quality_flag)`` reads into day rows."""
+        by_day = defaultdict(dict)
+        count = 0
+        for meter_id, ts, kwh, kvarh, flag in rows:
+            day, slot = settlement_slot(ts)
+            by_day[(meter_id, day)][slot] = (kwh, kvarh, flag or 'A')
+            count += 1
+        keys = list(by_day)
+        for start in range(0, len(keys), MERGE_CHUNK_SIZE):
+            self._merge_days({key: by_day[key] for key in keys[start:start + MERGE_CHUNK_SIZE]})
+        self.invalidate_model(['quality_codes', 'total_kwh', 'period_count'])
+        return count
+
+    def _merge_days(self, slots_by_key):
+        self.flush_model()
+        meter_ids = list({key[0] for key in slots_by_key})
+        days = list({key[1] for key in slots_by_key})
+        self.env.cr.execute("""
+            SELECT meter_product_id, day, kwh_values, kvarh_values, quality_codes
+              FROM energy_hh_day
+             WHERE meter_product_id = ANY(%s) AND day = ANY(%s)
+        """, (meter_ids, days))
+        existing = {(r[0], r[1]): r[2:] for r in self.env.cr.fetchall()}
+
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        params = []
+        for (meter_id, day), slots in slots_by_key.items():
+            periods = settlement_day_bounds(day)[1]
+            kwh_values, kvarh_values, codes = existing.get((meter_id, day)) or (None, None, None)
+            kwh_values = list(kwh_values or [None] * periods)
+            kvarh_values = list(kvarh_values or [None] * periods)
+            codes = list(codes or MISSING * periods)
+            for slot, (kwh, kvarh, flag) in slots.items():
+                kwh_values[slot] = kwh
+                kvarh_values[slot] = kvarh
+                codes[slot] = flag
+            total = sum(v for v in kwh_values if v is not None)
+            params.extend((meter_id, day, periods, ''.join(codes), total, kwh_values, kvarh_values, uid, now, uid, now))
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(slots_by_key))
+        self.env.cr.execute(f"""
+            INSERT INTO energy_hh_day
+                (meter_product_id, day, period_count, quality_codes, total_kwh,
+                 kwh_values, kvarh_values, create_uid, create_date, write_uid, write_date)
+            VALUES {placeholders}
+            ON CONFLICT (meter_product_id, day) DO UPDATE
+               SET period_count = EXCLUDED.period_count,
+                   quality_codes = EXCLUDED.quality_codes,
+                   total_kwh = EXCLUDED.total_kwh,
+                   kwh_values = EXCLUDED.kwh_values,
+                   kvarh_values = EXCLUDED.kvarh_values,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, params)
+
+    @api.model
+    def _read_series(self, meter_ids, dt_from, dt_to):
+        """Same contract as ``energy.hh.read._read_series``, built from packed day rows."""
+        self.flush_model()
+        # settlement days straddle UTC midnight, so widen the day range either side
+        self.env.cr.execute("""
+            SELECT meter_product_id, day, kwh_values, kvarh_values, quality_codes
+              FROM energy_hh_day
+             WHERE meter_product_id = ANY(%s) AND day >= %s AND day <= %s
+          ORDER BY meter_product_id, day
+        """, (list(meter_ids), dt_from.date() - timedelta(days=1), dt_to.date() + timedelta(days=1)))
+        parts = defaultdict(list)
+        for meter_id, day, kwh_values, kvarh_values, codes in self.env.cr.fetchall():
+            start, periods = settlement_day_bounds(day)
+            ts = np.datetime64(start, 'm') + np.arange(periods) * np.timedelta64(30, 'm')
+            parts[meter_id].append((
+                ts,
+                np.array(kwh_values, dtype=float),
+                np.array(kvarh_values, dtype=float),
+                np.array(list(codes), dtype='<U1'),
+            ))
+        lo, hi = np.datetime64(dt_from, 'm'), np.datetime64(dt_to, 'm')
+        result = {}
+        for meter_id in meter_ids:
+            if not parts.get(meter_id):
+                result[meter_id] = empty_series()
+                continue
+            ts, kwh, kvarh, quality = (np.concatenate(a) for a in zip(*parts[meter_id]))
+            mask = (ts >= lo) & (ts < hi) & (quality != MISSING)
+            result[meter_id] = HHSeries(ts[mask], kwh[mask], np.nan_to_num(kvarh[mask]), quality[mask])
+        return result
+
+    @api.model
+    def _pack_rows(self, meter_ids=None, batch_size=100):
+        """Move existing energy.hh.read rows into day rows, ``batch_size`` meters at a time."""
+        HHRead = self.env['energy.hh.read']
+        HHRead.flush_model()
+        if meter_ids is None:
+            self.env.cr.execute("SELECT DISTINCT meter_product_id FROM energy_hh_read")
+            meter_ids = [r[0] for r in self.env.cr.fetchall()]
+        for start in range(0, len(meter_ids), batch_size):
+            batch = meter_ids[start:start + batch_size]
+            self.env.cr.execute("""
+                SELECT meter_product_id, ts_utc, kwh, kvarh, quality_flag
+                  FROM energy_hh_read WHERE meter_product_id = ANY(%s)
+            """, (batch,))
+            self._bulk_merge(self.env.cr.fetchall())
+            self.env.cr.execute("DELETE FROM energy_hh_read WHERE meter_product_id = ANY(%s)", (batch,))
+        HHRead.invalidate_model()
+        return len(meter_ids)
+
+    @api.model
+    def _unpack_days(self, meter_ids=None, batch_size=100):
+        """Move day rows back into one energy.hh.read per interval, ``batch_size`` meters at a time."""
+        HHRead = self.env['energy.hh.read']
+        self.flush_model()
+        if meter_ids is None:
+            self.env.cr.execute("SELECT DISTINCT meter_product_id FROM energy_hh_day")
+            meter_ids = [r[0] for r in self.env.cr.fetchall()]
+        for start in range(0, len(meter_ids), batch_size):
+            batch = meter_ids[start:start + batch_size]
+            self.env.cr.execute("""
+                SELECT meter_product_id, day, kwh_values, kvarh_values, quality_codes
+                  FROM energy_hh_day WHERE meter_product_id = ANY(%s)
+            """, (batch,))
+            rows = []
+            for meter_id, day, kwh_values, kvarh_values, codes in self.env.cr.fetchall():
+                day_start = settlement_day_bounds(day)[0]
+                for slot, flag in enumerate(codes or ''):
+                    if flag != MISSING:
+                        rows.append((meter_id, day_start + slot * HALF_HOUR, kwh_values[slot],
+                                     kvarh_values[slot] if kvarh_values else None, flag))
+            HHRead._upsert_rows(rows)
+            self.env.cr.execute("DELETE FROM energy_hh_day WHERE meter_product_id = ANY(%s)", (batch,))
+        self.invalidate_model()
+        return len(meter_ids)
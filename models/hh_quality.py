@@ -0,0 +1,213 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+from .batching import iter_cron_batches
+from .hh_read import settlement_day_bounds, uk_local, local_calendar
+from .hh_summary import local_slot, slot_profile
+
+# Meters whose reads are pulled into memory per scan batch.
+QUALITY_METER_BATCH = 200
+# A read above this multiple of the meter's 95th percentile actual read is a spike.
+SPIKE_FACTOR = 10.0
+# Like-day substitution looks up the same local slot this many days away, nearest first.
+LIKE_DAY_OFFSETS = (-7, 7, -14, 14)
+
+HALF_HOUR = np.timedelta64(30, 'm')
+
+# Result of scan_series for one meter; masks are aligned with the expected
+# slots (``missing``) or with the reads inside the scanned range (the rest).
+QualityScan = namedtuple('QualityScan', [
+    'ts', 'missing', 'negative', 'spike', 'duplicate_count', 'dst_anomaly_days',
+])
+
+
+def expected_slots(day_from, day_to):
+    """Return ``(slots, day_index, periods)`` for the settlement days in [day_from, day_to).
+
+    ``slots`` holds the UTC start of every settlement period, ``day_index``
+    the day each slot belongs to and ``periods`` the period count of each
+    day (46 and 50 on clock-change days).
+    """
+    days = [day_from + timedelta(days=k) for k in range((day_to - day_from).days)]
+    bounds = [settlement_day_bounds(day) for day in days]
+    periods = np.array([p for __, p in bounds], dtype=int)
+    if not days:
+        return np.array([], dtype='datetime64[m]'), np.array([], dtype=int), periods
+    slots = np.concatenate([np.datetime64(start, 'm') + np.arange(p) * HALF_HOUR for start, p in bounds])
+    return slots, np.repeat(np.arange(len(days)), periods), periods
+
+
+def spike_threshold(series, spike_factor=SPIKE_FACTOR):
+    actual = series.kwh[(series.quality == 'A') & (series.kwh > 0)]
+    return spike_factor * np.percentile(actual, 95) if actual.size else np.inf
+
+
+def scan_series(series, slots, day_index, periods, threshold):
+    """Find gaps, duplicates, negative or spike values and DST anomalies in one meter's series."""
+    if not slots.size:
+        empty = np.array([], dtype=bool)
+        return QualityScan(series.ts[:0], empty, empty, empty, 0, 0)
+    in_range = (series.ts >= slots[0]) & (series.ts < slots[-1] + HALF_HOUR)
+    ts, kwh = series.ts[in_range], series.kwh[in_range]
+    unique_ts, counts = np.unique(ts, return_counts=True)
+    on_grid = np.isin(unique_ts, slots)
+    present = np.isin(slots, ts)
+    # a read that repeats a timestamp or sits between period starts double counts energy
+    duplicate_count = int((counts - 1).sum() + (~on_grid).sum())
+
+    reads_per_day = np.bincount(day_index[present], minlength=len(periods))
+    off_grid_days = day_index[np.clip(np.searchsorted(slots, unique_ts[~on_grid], side='right') - 1, 0, None)]
+    off_grid_per_day = np.bincount(off_grid_days, minlength=len(periods))
+    clock_change = periods != 48
+    dst_anomaly = clock_change & ((reads_per_day != periods) | (off_grid_per_day > 0))
+    return QualityScan(ts, ~present, kwh < 0, kwh > threshold, duplicate_count, int(dst_anomaly.sum()))
+
+
+def substitute_values(ts, values, targets):
+    """Estimate ``values`` at the UTC ``targets`` from the good reads ``(ts, values)``.
+
+    Each target takes the read at the same local wall-clock time on the
+    nearest like day (see LIKE_DAY_OFFSETS); targets without one fall back
+    to the weekday/weekend slot profile. Returns NaN where no estimate is
+    possible, i.e. when there are no good reads at all.
+    """
+    out = np.full(targets.shape, np.nan)
+    if not ts.size or not targets.size:
+        return out
+    local = uk_local(ts)
+    order = np.argsort(local, kind='stable')
+    local, values_sorted = local[order], values[order]
+    target_local = uk_local(targets)
+    for offset in LIKE_DAY_OFFSETS:
+        todo = np.isnan(out)
+        if not todo.any():
+            return out
+        wanted = target_local[todo] + np.timedelta64(offset, 'D')
+        idx = np.minimum(np.searchsorted(local, wanted), len(local) - 1)
+        hit = local[idx] == wanted
+        filled = out[todo]
+        filled[hit] = values_sorted[idx[hit]]
+        out[todo] = filled
+    todo = np.isnan(out)
+    if todo.any():
+        profile = slot_profile(ts, values)
+        # a meter read only on weekdays (or weekends) borrows the other profile
+        if not profile['weekend'].any():
+            profile['weekend'] = profile['weekday']
+        elif not profile['weekday'].any():
+            profile['weekday'] = profile['weekend']
+        local_todo, hour, is_night, is_weekend = local_calendar(targets[todo])
+        slot = local_slot(local_todo)
+        out[todo] = np.where(is_weekend, profile['weekend'][slot], profile['weekday'][slot])
+    return out
+
+
+class EnergyHHQuality(models.Model):
+    _name = 'energy.hh.quality'
+    _description = 'Half-Hourly Data Quality'
+    _order = 'month desc, meter_product_id'
+
+    meter_product_id = fields.Many2one('product.product', string='Meter', required=True, index=True, ondelete='cascade')
+    month = fields.Date(required=True, help='First day of the UK calendar month.')
+    expected_count = fields.Integer(string='Expected Intervals')
+    read_count = fields.Integer(string='Intervals Read')
+    gap_count = fields.Integer(string='Gaps')
+    duplicate_count = fields.Integer(string='Duplicates')
+    negative_count = fields.Integer(string='Negative')
+    spike_count = fields.Integer(string='Spikes')
+    dst_anomaly_days = fields.Integer(string='DST Anomalies', help='Clock-change days whose reads do not match their 46 or 50 periods.')
+    substituted_count = fields.Integer(string='Substituted')
+    has_issues = fields.Boolean(index=True)
+
+    _meter_month_unique = models.Constraint(
+        'UNIQUE(meter_product_id, month)',
+        'Only one quality scan is allowed per meter and month.',
+    )
+
+    @api.model
+    def _scan(self, meter_ids=None, month=None, substitute=True, fix_suspect=False):
+        """Scan whole UK calendar ``month`` for ``meter_ids`` and fill gaps with 'S' reads.
+
+        With ``fix_suspect`` negative and spike reads are replaced too. Meters
+        are processed QUALITY_METER_BATCH at a time: one series fetch over the
+        month plus the like-day margin, vectorised checks, one bulk upsert of
+        substitutes and one batched create of scan results per batch.
+        """
+        today = fields.Date.context_today(self)
+        month = (month or today - relativedelta(months=1)).replace(day=1)
+        next_month = month + relativedelta(months=1)
+        if meter_ids is None:
+            meter_ids = self.env['product.product'].with_context(active_test=False).search([
+                ('is_energy_meter', '=', True), ('meter_type', '=', 'hh'),
+            ]).ids
+        slots, day_index, periods = expected_slots(month, next_month)
+        # only periods that have ended can be missing
+        current = slots < np.datetime64(fields.Datetime.now(), 'm') - HALF_HOUR
+        slots, day_index = slots[current], day_index[current]
+        margin = timedelta(days=max(abs(o) for o in LIKE_DAY_OFFSETS))
+        dt_from = settlement_day_bounds(month)[0] - margin
+        dt_to = settlement_day_bounds(next_month)[0] + margin
+
+        HHRead = self.env['energy.hh.read']
+        for start in range(0, len(meter_ids), QUALITY_METER_BATCH):
+            batch = meter_ids[start:start + QUALITY_METER_BATCH]
+            substitutes, vals_list = [], []
+            for meter_id, series in HHRead._read_series(batch, dt_from, dt_to).items():
+                threshold = spike_threshold(series)
+                scan = scan_series(series, slots, day_index, periods, threshold)
+                targets = slots[scan.missing]
+                if fix_suspect:
+                    targets = np.union1d(targets, scan.ts[scan.negative | scan.spike])
+                substituted = 0
+                if substitute and targets.size:
+                    good = np.isin(series.quality, ('A', 'E')) & (series.kwh >= 0) & (series.kwh <= threshold)
+                    kwh = substitute_values(series.ts[good], series.kwh[good], targets)
+                    kvarh = substitute_values(series.ts[good], series.kvarh[good], targets)
+                    ok = ~np.isnan(kwh)
+                    substitutes.extend(zip(
+                        [meter_id] * int(ok.sum()),
+                        targets[ok].astype('datetime64[s]').astype(datetime).tolist(),
+                        kwh[ok].tolist(),
+                        np.nan_to_num(kvarh[ok]).tolist(),
+                        ['S'] * int(ok.sum()),
+                    ))
+                    substituted = int(ok.sum())
+                issues = (int(scan.missing.sum()), scan.duplicate_count, int(scan.negative.sum()),
+                          int(scan.spike.sum()), scan.dst_anomaly_days)
+                vals_list.append({
+                    'meter_product_id': meter_id,
+                    'month': month,
+                    'expected_count': len(slots),
+                    'read_count': len(slots) - issues[0],
+                    'gap_count': issues[0],
+                    'duplicate_count': issues[1],
+                    'negative_count': issues[2],
+                    'spike_count': issues[3],
+                    'dst_anomaly_days': issues[4],
+                    'substituted_count': substituted,
+                    'has_issues': any(issues),
+                })
+            HHRead._bulk_upsert(substitutes)
+            self.search([('meter_product_id', 'in', batch), ('month', '=', month)]).unlink()
+            self.create(vals_list)
+        return len(meter_ids)
+
+    @api.model
+    def cron_scan_quality(self):
+        """Scan last month for every HH meter not scanned yet, resuming across runs."""
+        month = (fields.Date.context_today(self) - relativedelta(months=1)).replace(day=1)
+        scanned = self.search([('month', '=', month)]).meter_product_id.ids
+        meters = self.env['product.product'].with_context(active_test=False).search([
+            ('is_energy_meter', '=', True), ('meter_type', '=', 'hh'), ('id', 'not in', scanned),
+        ])
+        for batch in iter_cron_batches(meters, QUALITY_METER_BATCH):
+            self._scan(batch.ids, month)
+
+    def action_rescan(self):
+        for month, scans in self.grouped('month').items():
+            self._scan(scans.meter_product_id.ids, month)
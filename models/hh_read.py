@@ -1,4 +1,94 @@
-from odoo import models, fields
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pytz
+
+from odoo import models, fields, api, _
+
+from .meter_ids import normalise_identifier
+
+UK_TZ = pytz.timezone('Europe/London')
+HALF_HOUR = timedelta(minutes=30)
+
+# Rows per multi-row INSERT statement issued by _bulk_upsert.
+UPSERT_CHUNK_SIZE = 5000
+
+# Local hours [start, end) treated as night for day/night splits.
+NIGHT_START_HOUR = 0
+NIGHT_END_HOUR = 7
+
+# Arrays returned by _read_series for one meter, aligned index by index.
+HHSeries = namedtuple('HHSeries', ['ts', 'kwh', 'kvarh', 'quality'])
+
+
+@lru_cache(maxsize=4096)
+def settlement_day_bounds(day):
+    """UTC start of a UK settlement day and its number of periods (46, 48 or 50)."""
+    midnight = UK_TZ.localize(datetime.combine(day, datetime.min.time()))
+    next_midnight = UK_TZ.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+    periods = int((next_midnight - midnight) / HALF_HOUR)
+    return midnight.astimezone(pytz.utc).replace(tzinfo=None), periods
+
+
+def settlement_period_start(day, period):
+    """UTC start of a UK settlement period (1-based, counted from local midnight)."""
+    start, periods = settlement_day_bounds(day)
+    if not 1 <= period <= periods:
+        raise ValueError(_('Settlement period %(period)s out of range (1-%(max)s)', period=period, max=periods))
+    return start + (period - 1) * HALF_HOUR
+
+
+def settlement_slot(ts_utc):
+    """Return the ``(settlement day, 0-based slot)`` a naive UTC timestamp falls in."""
+    day = pytz.utc.localize(ts_utc).astimezone(UK_TZ).date()
+    start = settlement_day_bounds(day)[0]
+    return day, int((ts_utc - start) / HALF_HOUR)
+
+
+def _last_sunday(year, month):
+    day = date(year, month, 31)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def uk_local(ts):
+    """Shift an array of UTC ``datetime64`` values to UK local (GMT/BST) wall time.
+
+    BST runs from 01:00 UTC on the last Sunday of March to 01:00 UTC on the
+    last Sunday of October.
+    """
+    ts = ts.astype('datetime64[m]')
+    if not ts.size:
+        return ts
+    first, last = ts.min().astype(object).year, ts.max().astype(object).year
+    offset = np.zeros(ts.shape, dtype='timedelta64[m]')
+    for year in range(first, last + 1):
+        bst_start = np.datetime64(datetime.combine(_last_sunday(year, 3), datetime.min.time()) + timedelta(hours=1), 'm')
+        bst_end = np.datetime64(datetime.combine(_last_sunday(year, 10), datetime.min.time()) + timedelta(hours=1), 'm')
+        offset[(ts >= bst_start) & (ts < bst_end)] = np.timedelta64(60, 'm')
+    return ts + offset
+
+
+def local_calendar(ts):
+    """Return ``(local, hour, is_night, is_weekend)`` arrays for UTC ``datetime64`` values."""
+    local = uk_local(ts)
+    days = local.astype('datetime64[D]')
+    hour = ((local - days).astype('timedelta64[m]').astype(int)) // 60
+    # 1970-01-01 was a Thursday, so shift by 3 to get Monday == 0
+    weekday = (days.astype(int) + 3) % 7
+    is_night = (hour >= NIGHT_START_HOUR) & (hour < NIGHT_END_HOUR)
+    return local, hour, is_night, weekday >= 5
+
+
+def empty_series():
+    return HHSeries(
+        np.array([], dtype='datetime64[m]'),
+        np.array([], dtype=float),
+        np.array([], dtype=float),
+        np.array([], dtype='<U1'),
+    )
+
 
 class EnergyHHRead(models.Model):
     _name = 'energy.hh.read'
@@ -11,3 +101,123 @@ class EnergyHHRead(models.Model):
     quality_flag = fields.Selection([
         ('A','Actual'),('E','Estimate'),('S','Substitute')
     ], default='A', index=True)
+
+    _meter_ts_unique = models.Constraint(
+        'UNIQUE(meter_product_id, ts_utc)',
+        'Only one half-hourly read is allowed per meter and timestamp.',
+    )
+
+    @api.model
+    def _get_storage_mode(self):
+        """'rows' keeps one energy.hh.read per interval, 'daily' packs them into energy.hh.day."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        return ICP.get_param('energy_broker_uk.hh_storage_mode') or 'rows'
+
+    @api.model
+    def _get_meter_index(self):
+        """Map canonical MPAN/MPRN (and default code) to meter product ids."""
+        index = {}
+        meters = self.env['product.product'].with_context(active_test=False).search_read(
+            [('is_energy_meter', '=', True)], ['meter_key', 'default_code'], order='active desc, id')
+        # meter keys win over other meters' default codes, active meters over archived ones
+        for meter in meters:
+            if meter['meter_key']:
+                index.setdefault(meter['meter_key'], meter['id'])
+        for meter in meters:
+            code = normalise_identifier(meter['default_code'])
+            if code:
+                index.setdefault(code, meter['id'])
+        return index
+
+    @api.model
+    def _bulk_upsert(self, rows):
+        """Insert or update reads with multi-row INSERT ... ON CONFLICT.
+
+        ``rows`` is an iterable of ``(meter_product_id, ts_utc, kwh, kvarh, quality_flag)``
+        tuples. The ORM is bypassed entirely, so callers are responsible for
+        validating values beforehand. Returns the number of rows written.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        if self._get_storage_mode() == 'daily':
+            written = self.env['energy.hh.day']._bulk_merge(rows)
+        else:
+            written = self._upsert_rows(rows)
+        timestamps = [row[1] for row in rows]
+        self._on_reads_changed({row[0] for row in rows}, min(timestamps), max(timestamps) + HALF_HOUR)
+        return written
+
+    def _upsert_rows(self, rows):
+        self.flush_model()
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        written = 0
+        batch = {}
+        for row in rows:
+            # a key may only appear once per statement for ON CONFLICT DO UPDATE
+            batch[(row[0], row[1])] = row
+            if len(batch) >= UPSERT_CHUNK_SIZE:
+                written += self._upsert_batch(list(batch.values()), uid, now)
+                batch = {}
+        if batch:
+            written += self._upsert_batch(list(batch.values()), uid, now)
+        self.invalidate_model(['kwh', 'kvarh', 'quality_flag'])
+        return written
+
+    def _upsert_batch(self, batch, uid, now):
+        params = []
+        for meter_id, ts, kwh, kvarh, flag in batch:
+            params.extend((meter_id, ts, kwh, kvarh, flag or 'A', uid, now, uid, now))
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(batch))
+        self.env.cr.execute(f"""
+            INSERT INTO energy_hh_read
+                (meter_product_id, ts_utc, kwh, kvarh, quality_flag,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES {placeholders}
+            ON CONFLICT (meter_product_id, ts_utc) DO UPDATE
+               SET kwh = EXCLUDED.kwh,
+                   kvarh = EXCLUDED.kvarh,
+                   quality_flag = EXCLUDED.quality_flag,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, params)
+        return len(batch)
+
+    @api.model
+    def _on_reads_changed(self, meter_ids, dt_from, dt_to):
+        """Hook called after reads of ``meter_ids`` in [dt_from, dt_to) were written."""
+
+    @api.model
+    def _read_series(self, meter_ids, dt_from, dt_to):
+        """Return ``{meter_id: HHSeries}`` for reads with ``dt_from <= ts_utc < dt_to``.
+
+        Works against whichever storage mode is configured; meters without
+        reads in the range get an empty series.
+        """
+        if self._get_storage_mode() == 'daily':
+            return self.env['energy.hh.day']._read_series(meter_ids, dt_from, dt_to)
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT meter_product_id, ts_utc, kwh, COALESCE(kvarh, 0.0), COALESCE(quality_flag, 'A')
+              FROM energy_hh_read
+             WHERE meter_product_id = ANY(%s) AND ts_utc >= %s AND ts_utc < %s
+          ORDER BY meter_product_id, ts_utc
+        """, (list(meter_ids), dt_from, dt_to))
+        rows_by_meter = {}
+        for row in self.env.cr.fetchall():
+            rows_by_meter.setdefault(row[0], []).append(row[1:])
+        result = {}
+        for meter_id in meter_ids:
+            rows = rows_by_meter.get(meter_id)
+            if not rows:
+                result[meter_id] = empty_series()
+                continue
+            ts, kwh, kvarh, quality = zip(*rows)
+            result[meter_id] = HHSeries(
+                np.array(ts, dtype='datetime64[m]'),
+                np.array(kwh, dtype=float),
+                np.array(kvarh, dtype=float),
+                np.array(quality, dtype='<U1'),
+            )
+        return result
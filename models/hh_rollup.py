@@ -0,0 +1,248 @@
+from datetime import timedelta
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+from .batching import iter_cron_batches
+from .hh_read import HALF_HOUR, settlement_day_bounds, settlement_slot, uk_local
+from .hh_summary import local_slot
+
+# Days covered by the rolling rollup fields.
+ROLLUP_DAYS = 365
+# Meters whose reads are pulled into memory per bucket rebuild batch.
+ROLLUP_METER_BATCH = 200
+# Months of history bucketed when rebuilding from scratch.
+ROLLUP_REBUILD_MONTHS = 13
+# HH usage replaces the declared annual usage on tenders only above this completeness (%).
+TENDER_MIN_COMPLETENESS = 90.0
+
+ROLLUP_FIELDS = ['hh_annual_kwh', 'hh_max_kva', 'hh_last_read', 'hh_completeness']
+
+
+def daily_buckets(series):
+    """Group one meter's HHSeries into UK settlement days.
+
+    Returns ``[(day, kwh, peak_kva, interval_count, last_read, min_kw, peak_kw, slot_kwh)]``,
+    one tuple per day present in the series. ``slot_kwh`` holds the mean kWh
+    of each of the 48 local half-hours (None where there is no read), so the
+    repeated hour of a 50-period day is averaged rather than doubled.
+    """
+    if not series.ts.size:
+        return []
+    local = uk_local(series.ts)
+    days, idx = np.unique(local.astype('datetime64[D]'), return_inverse=True)
+    n = len(days)
+    kwh = np.bincount(idx, weights=series.kwh, minlength=n)
+    counts = np.bincount(idx, minlength=n)
+    peak_kva = np.zeros(n)
+    np.maximum.at(peak_kva, idx, np.hypot(series.kwh * 2.0, series.kvarh * 2.0))
+    last = np.zeros(n, dtype='int64')
+    np.maximum.at(last, idx, series.ts.astype('datetime64[m]').astype('int64'))
+    min_kw = np.full(n, np.inf)
+    peak_kw = np.full(n, -np.inf)
+    np.minimum.at(min_kw, idx, series.kwh * 2.0)
+    np.maximum.at(peak_kw, idx, series.kwh * 2.0)
+    slot = local_slot(local)
+    slot_sum = np.zeros((n, 48))
+    slot_count = np.zeros((n, 48))
+    np.add.at(slot_sum, (idx, slot), series.kwh)
+    np.add.at(slot_count, (idx, slot), 1)
+    slot_mean = np.divide(slot_sum, slot_count, out=np.full((n, 48), np.nan), where=slot_count > 0)
+    slot_kwh = [[None if np.isnan(v) else v for v in row] for row in slot_mean.tolist()]
+    return list(zip(
+        days.astype(object).tolist(),
+        kwh.tolist(),
+        peak_kva.tolist(),
+        counts.tolist(),
+        last.astype('datetime64[m]').astype(object).tolist(),
+        min_kw.tolist(),
+        peak_kw.tolist(),
+        slot_kwh,
+    ))
+
+
+class EnergyHHDayRollup(models.Model):
+    """Per meter and settlement day totals the rolling meter/site figures are summed from.
+
+    Only the buckets of days touched by a write are rebuilt, so keeping the
+    rollups current never rescans a meter's history.
+    """
+    _name = 'energy.hh.day.rollup'
+    _description = 'Half-Hourly Daily Rollup'
+    _order = 'meter_product_id, day'
+
+    meter_product_id = fields.Many2one('product.product', string='Meter', required=True, ondelete='cascade')
+    day = fields.Date(string='Settlement Day', required=True)
+    kwh = fields.Float(string='kWh')
+    peak_kva = fields.Float(string='Peak kVA')
+    interval_count = fields.Integer(string='Intervals')
+    last_read = fields.Datetime()
+    min_kw = fields.Float(string='Min kW')
+    peak_kw = fields.Float(string='Peak kW')
+
+    _meter_day_unique = models.Constraint(
+        'UNIQUE(meter_product_id, day)',
+        'Only one rollup is allowed per meter and day.',
+    )
+
+    def init(self):
+        # mean kWh per local half-hour, one element per slot; the chart tiles
+        self.env.cr.execute("""
+            ALTER TABLE energy_hh_day_rollup
+                ADD COLUMN IF NOT EXISTS slot_kwh float8[]
+        """)
+
+    @api.model
+    def _update_buckets(self, meter_ids, dt_from, dt_to):
+        """Rebuild the buckets of the settlement days [dt_from, dt_to) touches, then the meter rollups."""
+        day_from = settlement_slot(dt_from)[0]
+        day_to = settlement_slot(dt_to - HALF_HOUR)[0] + timedelta(days=1)
+        meter_ids = list(meter_ids)
+        series_by_meter = self.env['energy.hh.read']._read_series(
+            meter_ids, settlement_day_bounds(day_from)[0], settlement_day_bounds(day_to)[0])
+        self._upsert_buckets([
+            (meter_id,) + bucket
+            for meter_id, series in series_by_meter.items()
+            for bucket in daily_buckets(series)
+        ])
+        self._refresh_meters(meter_ids)
+
+    @api.model
+    def _rebuild_buckets(self, meter_ids=None):
+        """Bucket the last ROLLUP_REBUILD_MONTHS of reads from scratch, e.g. after install."""
+        if meter_ids is None:
+            meter_ids = self.env['product.product'].with_context(active_test=False).search([
+                ('is_energy_meter', '=', True), ('meter_type', '=', 'hh'),
+            ]).ids
+        date_to = fields.Date.context_today(self) + timedelta(days=1)
+        dt_from = settlement_day_bounds(date_to - relativedelta(months=ROLLUP_REBUILD_MONTHS))[0]
+        dt_to = settlement_day_bounds(date_to)[0]
+        for start in range(0, len(meter_ids), ROLLUP_METER_BATCH):
+            self._update_buckets(meter_ids[start:start + ROLLUP_METER_BATCH], dt_from, dt_to)
+
+    def _upsert_buckets(self, rows):
+        if not rows:
+            return
+        self.flush_model()
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        params = []
+        for row in rows:
+            params.extend(row + (uid, now, uid, now))
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s::float8[], %s, %s, %s, %s)'] * len(rows))
+        self.env.cr.execute(f"""
+            INSERT INTO energy_hh_day_rollup
+                (meter_product_id, day, kwh, peak_kva, interval_count, last_read, min_kw, peak_kw, slot_kwh,
+                 create_uid, create_date, write_uid, write_date)
+            VALUES {placeholders}
+            ON CONFLICT (meter_product_id, day) DO UPDATE
+               SET kwh = EXCLUDED.kwh,
+                   peak_kva = EXCLUDED.peak_kva,
+                   interval_count = EXCLUDED.interval_count,
+                   last_read = EXCLUDED.last_read,
+                   min_kw = EXCLUDED.min_kw,
+                   peak_kw = EXCLUDED.peak_kw,
+                   slot_kwh = EXCLUDED.slot_kwh,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """, params)
+        self.invalidate_model(['kwh', 'peak_kva', 'interval_count', 'last_read', 'min_kw', 'peak_kw'])
+
+    @api.model
+    def _refresh_meters(self, meter_ids):
+        """Sum the last ROLLUP_DAYS of buckets onto the meters and their sites in three statements."""
+        meter_ids = list(meter_ids)
+        if not meter_ids:
+            return
+        today = fields.Date.context_today(self)
+        window_from = today - timedelta(days=ROLLUP_DAYS)
+        # periods per day over the window, so completeness copes with 46/50-period days
+        periods = np.cumsum([0] + [settlement_day_bounds(window_from + timedelta(days=k))[1]
+                                   for k in range(ROLLUP_DAYS)])
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT meter_product_id,
+                   SUM(kwh) FILTER (WHERE day >= %(from)s AND day < %(to)s),
+                   MAX(peak_kva) FILTER (WHERE day >= %(from)s AND day < %(to)s),
+                   SUM(interval_count) FILTER (WHERE day >= %(from)s AND day < %(to)s),
+                   MIN(day) FILTER (WHERE day >= %(from)s AND day < %(to)s),
+                   MAX(last_read)
+              FROM energy_hh_day_rollup
+             WHERE meter_product_id = ANY(%(ids)s)
+          GROUP BY meter_product_id
+        """, {'from': window_from, 'to': today, 'ids': meter_ids})
+        totals = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+        params = []
+        for meter_id in meter_ids:
+            kwh, kva, intervals, first_day, last_read = totals.get(meter_id) or (0.0, 0.0, 0, None, None)
+            # completeness counts from the first read in the window, not from before the meter existed
+            expected = periods[-1] - periods[(first_day - window_from).days] if first_day else 0
+            completeness = 100.0 * (intervals or 0) / expected if expected else 0.0
+            params.extend((meter_id, kwh or 0.0, kva or 0.0, last_read, min(completeness, 100.0)))
+        placeholders = ', '.join(['(%s, %s, %s, %s::timestamp, %s)'] * len(meter_ids))
+        Product, Site = self.env['product.product'], self.env['customer.site']
+        Product.flush_model(ROLLUP_FIELDS + ['meter_key', 'active'])
+        Site.flush_model(ROLLUP_FIELDS + ['meter_key'])
+        self.env.cr.execute(f"""
+            UPDATE product_product p
+               SET hh_annual_kwh = v.kwh, hh_max_kva = v.kva, hh_last_read = v.last_read, hh_completeness = v.completeness
+              FROM (VALUES {placeholders}) AS v(id, kwh, kva, last_read, completeness)
+             WHERE p.id = v.id
+        """, params)
+        self.env.cr.execute("""
+            UPDATE customer_site s
+               SET hh_annual_kwh = p.hh_annual_kwh, hh_max_kva = p.hh_max_kva,
+                   hh_last_read = p.hh_last_read, hh_completeness = p.hh_completeness
+              FROM product_product p
+             WHERE p.id = ANY(%s) AND p.active AND p.meter_key = s.meter_key
+        """, (meter_ids,))
+        Product.invalidate_model(ROLLUP_FIELDS)
+        Site.invalidate_model(ROLLUP_FIELDS)
+
+    @api.model
+    def cron_refresh_rollups(self):
+        """Roll the 12-month window forward for every HH meter from buckets alone."""
+        meters = self.env['product.product'].with_context(active_test=False).search([
+            ('is_energy_meter', '=', True), ('meter_type', '=', 'hh'),
+        ])
+        for batch in iter_cron_batches(meters):
+            self._refresh_meters(batch.ids)
+
+
+class EnergyHHRead(models.Model):
+    _inherit = 'energy.hh.read'
+
+    @api.model
+    def _on_reads_changed(self, meter_ids, dt_from, dt_to):
+        super()._on_reads_changed(meter_ids, dt_from, dt_to)
+        self.env['energy.hh.day.rollup'].sudo()._update_buckets(meter_ids, dt_from, dt_to)
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    hh_annual_kwh = fields.Float(string='Last 12 Months kWh', readonly=True, copy=False)
+    hh_max_kva = fields.Float(string='Max Demand (kVA)', readonly=True, copy=False)
+    hh_last_read = fields.Datetime(string='Last HH Read', readonly=True, copy=False)
+    hh_completeness = fields.Float(string='HH Completeness (%)', readonly=True, copy=False)
+
+    def _get_tender_usage(self):
+        """Return ``{meter_id: kWh}`` of HH usage complete enough to tender on."""
+        return {meter.id: meter.hh_annual_kwh for meter in self
+                if meter.hh_annual_kwh and meter.hh_completeness >= TENDER_MIN_COMPLETENESS}
+
+
+class CustomerSite(models.Model):
+    _inherit = 'customer.site'
+
+    hh_annual_kwh = fields.Float(string='Last 12 Months kWh', readonly=True, copy=False)
+    hh_max_kva = fields.Float(string='Max Demand (kVA)', readonly=True, copy=False)
+    hh_last_read = fields.Datetime(string='Last HH Read', readonly=True, copy=False)
+    hh_completeness = fields.Float(string='HH Completeness (%)', readonly=True, copy=False)
+
+    def _get_tender_usage(self):
+        """Return ``{site_id: kWh}`` of HH usage complete enough to tender on."""
+        return {site.id: site.hh_annual_kwh for site in self
+                if site.hh_annual_kwh and site.hh_completeness >= TENDER_MIN_COMPLETENESS}
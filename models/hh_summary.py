@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+
+from .hh_read import local_calendar
+
+# Meters whose reads are pulled into memory per aggregation batch.
+SUMMARY_METER_BATCH = 200
+# Months recomputed by the nightly cron.
+SUMMARY_MONTHS = 13
+
+
+def aggregate_monthly(series):
+    """Group one meter's HHSeries into UK calendar months.
+
+    Returns a list of dicts keyed like ``energy.hh.summary`` fields, one per
+    month present in the series.
+    """
+    if not series.ts.size:
+        return []
+    local, hour, is_night, is_weekend = local_calendar(series.ts)
+    months, idx = np.unique(local.astype('datetime64[M]'), return_inverse=True)
+    n = len(months)
+    kwh = series.kwh
+    kw = kwh * 2.0
+    kva = np.hypot(kw, series.kvarh * 2.0)
+
+    kwh_total = np.bincount(idx, weights=kwh, minlength=n)
+    kwh_night = np.bincount(idx, weights=np.where(is_night, kwh, 0.0), minlength=n)
+    kwh_weekend = np.bincount(idx, weights=np.where(is_weekend, kwh, 0.0), minlength=n)
+    intervals = np.bincount(idx, minlength=n)
+    peak_kw = np.zeros(n)
+    peak_kva = np.zeros(n)
+    np.maximum.at(peak_kw, idx, kw)
+    np.maximum.at(peak_kva, idx, kva)
+    mean_kw = np.divide(kwh_total, intervals * 0.5, out=np.zeros(n), where=intervals > 0)
+    load_factor = np.divide(mean_kw, peak_kw, out=np.zeros(n), where=peak_kw > 0)
+
+    month_starts = months.astype('datetime64[D]').astype(object)
+    return [{
+        'month': month_starts[i],
+        'kwh_total': float(kwh_total[i]),
+        'kwh_day': float(kwh_total[i] - kwh_night[i]),
+        'kwh_night': float(kwh_night[i]),
+        'kwh_weekday': float(kwh_total[i] - kwh_weekend[i]),
+        'kwh_weekend': float(kwh_weekend[i]),
+        'peak_kw': float(peak_kw[i]),
+        'peak_kva': float(peak_kva[i]),
+        'load_factor': float(load_factor[i]),
+        'interval_count': int(intervals[i]),
+    } for i in range(n)]
+
+
+def local_slot(local):
+    """0-based local half-hour slot of the day (0-47) for UK wall-clock ``datetime64`` values."""
+    return (local - local.astype('datetime64[D]')).astype('timedelta64[m]').astype(int) // 30
+
+
+def slot_profile(ts, values):
+    """Average of ``values`` per local half-hour slot, split weekday/weekend.
+
+    Returns ``{'weekday': ndarray(48), 'weekend': ndarray(48)}``; slots
+    without data average to zero.
+    """
+    profile = {'weekday': np.zeros(48), 'weekend': np.zeros(48)}
+    if ts.size:
+        local, hour, is_night, is_weekend = local_calendar(ts)
+        slot = local_slot(local)
+        for key, mask in (('weekday', ~is_weekend), ('weekend', is_weekend)):
+            totals = np.bincount(slot[mask], weights=values[mask], minlength=48)
+            counts = np.bincount(slot[mask], minlength=48)
+            profile[key] = np.divide(totals, counts, out=np.zeros(48), where=counts > 0)
+    return profile
+
+
+class EnergyHHSummary(models.Model):
+    _name = 'energy.hh.summary'
+    _description = 'Monthly Half-Hourly Consumption Summary'
+    _order = 'meter_product_id, month desc'
+
+    meter_product_id = fields.Many2one('product.product', string='Meter', required=True, index=True, ondelete='cascade')
+    month = fields.Date(required=True, help='First day of the UK calendar month.')
+    kwh_total = fields.Float(string='kWh')
+    kwh_day = fields.Float(string='Day kWh')
+    kwh_night = fields.Float(string='Night kWh')
+    kwh_weekday = fields.Float(string='Weekday kWh')
+    kwh_weekend = fields.Float(string='Weekend kWh')
+    peak_kw = fields.Float(string='Peak kW', aggregator='max')
+    peak_kva = fields.Float(string='Peak kVA', aggregator='max')
+    load_factor = fields.Float(aggregator='avg')
+    interval_count = fields.Integer(string='Intervals')
+
+    _meter_month_unique = models.Constraint(
+        'UNIQUE(meter_product_id, month)',
+        'Only one summary is allowed per meter and month.',
+    )
+
+    @api.model
+    def _recompute(self, meter_ids=None, date_from=None, date_to=None):
+        """Rebuild monthly summaries for ``meter_ids`` over whole months in [date_from, date_to).
+
+        Meters are processed ``SUMMARY_METER_BATCH`` at a time: one series
+        fetch, one vectorised aggregation, one unlink and one batched create
+        per batch.
+        """
+        today = fields.Date.context_today(self)
+        date_to = (date_to or today + relativedelta(months=1)).replace(day=1)
+        date_from = (date_from or date_to - relativedelta(months=SUMMARY_MONTHS)).replace(day=1)
+        if meter_ids is None:
+            meter_ids = self.env['product.product'].with_context(active_test=False).search([
+                ('is_energy_meter', '=', True), ('meter_type', '=', 'hh'),
+            ]).ids
+        # widen by a day so local months that start before UTC midnight are complete
+        dt_from = datetime.combine(date_from, datetime.min.time()) - relativedelta(days=1)
+        dt_to = datetime.combine(date_to, datetime.min.time()) + relativedelta(days=1)
+        HHRead = self.env['energy.hh.read']
+        for start in range(0, len(meter_ids), SUMMARY_METER_BATCH):
+            batch = meter_ids[start:start + SUMMARY_METER_BATCH]
+            series_by_meter = HHRead._read_series(batch, dt_from, dt_to)
+            vals_list = []
+            for meter_id, series in series_by_meter.items():
+                for vals in aggregate_monthly(series):
+                    if date_from <= vals['month'] < date_to:
+                        vals['meter_product_id'] = meter_id
+                        vals_list.append(vals)
+            self.search([
+                ('meter_product_id', 'in', batch),
+                ('month', '>=', date_from),
+                ('month', '<', date_to),
+            ]).unlink()
+            self.create(vals_list)
+        return len(meter_ids)
+
+    @api.model
+    def cron_recompute_summaries(self):
+        self._recompute()
+
+    @api.model
+    def _get_profile(self, meter_ids, dt_from, dt_to):
+        """Average kWh per local half-hour slot, split weekday/weekend.
+
+        Returns ``{meter_id: {'weekday': ndarray(48), 'weekend': ndarray(48)}}``.
+        """
+        series_by_meter = self.env['energy.hh.read']._read_series(meter_ids, dt_from, dt_to)
+        return {meter_id: slot_profile(series.ts, series.kwh) for meter_id, series in series_by_meter.items()}
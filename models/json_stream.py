@@ -0,0 +1,107 @@
+import io
+import json
+
+# Characters read from the underlying file per refill.
+JSON_STREAM_CHUNK = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+
+class JsonItemStream:
+    """Yield the items of a JSON array one at a time from a file object.
+
+    Only one item is decoded and held in memory at a time, so arbitrarily
+    large quote files can be mapped with a flat memory profile. The array
+    may be the document itself or the value of one of ``keys`` in a
+    top-level object; other top-level values are decoded and discarded.
+    """
+
+    def __init__(self, fileobj, keys=('offers', 'quotes', 'results'), chunk_size=JSON_STREAM_CHUNK):
+        if not isinstance(fileobj, io.TextIOBase):
+            fileobj = io.TextIOWrapper(fileobj, encoding='utf-8')
+        self.fileobj = fileobj
+        self.keys = keys
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.fileobj.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _next(self):
+        char = self._peek()
+        self.pos += 1
+        return char
+
+    def _expect(self, char):
+        found = self._next()
+        if found != char:
+            raise ValueError('Expected %r at offset %s, found %r' % (char, self.pos, found))
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number ending the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._next()
+            return
+        while True:
+            yield self._value()
+            char = self._next()
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "]" at offset %s, found %r' % (self.pos, char))
+
+    def __iter__(self):
+        char = self._peek()
+        if char == '[':
+            yield from self._array()
+            return
+        if char != '{':
+            raise ValueError('Expected a JSON array or object, found %r' % char)
+        self._next()
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key in self.keys and self._peek() == '[':
+                yield from self._array()
+                return
+            self._value()
+            char = self._next()
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "}" at offset %s, found %r' % (self.pos, char))
@@ -11,11 +11,19 @@ class CrmLead(models.Model):
     contract_count = fields.Integer(compute='_compute_broker_counts', string='Contracts')
 
     def _compute_broker_counts(self):
+        counters = {
+            'customer.loa': 'loa_count',
+            'supplier.price.request': 'request_count',
+            'supplier.price.response': 'response_count',
+            'customer.contract': 'contract_count',
+        }
+        counts = {}
+        for model, field_name in counters.items():
+            groups = self.env[model]._read_group([('lead_id', 'in', self._origin.ids)], ['lead_id'], ['__count'])
+            counts[field_name] = {lead.id: count for lead, count in groups}
         for lead in self:
-            lead.loa_count = self.env['customer.loa'].search_count([('lead_id', '=', lead.id)])
-            lead.request_count = self.env['supplier.price.request'].search_count([('lead_id', '=', lead.id)])
-            lead.response_count = self.env['supplier.price.response'].search_count([('lead_id', '=', lead.id)])
-            lead.contract_count = self.env['customer.contract'].search_count([('lead_id', '=', lead.id)])
+            for field_name, by_lead in counts.items():
+                lead[field_name] = by_lead.get(lead._origin.id, 0)
 
     def action_open_lead_loas(self):
         self.ensure_one()
@@ -0,0 +1,63 @@
+import re
+
+import numpy as np
+
+from odoo import _
+from odoo.exceptions import ValidationError
+
+# Weights of the 12 MPAN core digits in the check-digit sum.
+MPAN_WEIGHTS = np.array([3, 7, 1] * 4)
+ELECTRICITY_TYPES = ('hh', 'nhh')
+
+_SEPARATORS = re.compile(r'[\s\-]+')
+
+
+def normalise_identifier(value):
+    """Canonical MPAN/MPRN form: separators removed, upper case, ``False`` when empty."""
+    if not value:
+        return False
+    return _SEPARATORS.sub('', str(value)).upper() or False
+
+
+def check_identifiers(records, field='mpan_mprn'):
+    """Raise a ValidationError listing every record whose identifier is invalid."""
+    errors = identifier_errors([normalise_identifier(r[field]) for r in records], records.mapped('meter_type'))
+    messages = ['%s: %s' % (r[field], e) for r, e in zip(records, errors) if e]
+    if messages:
+        raise ValidationError('\n'.join(messages))
+
+
+def identifier_errors(identifiers, meter_types):
+    """Validate MPAN cores and MPRNs in one vectorised pass.
+
+    ``identifiers`` are normalised strings and ``meter_types`` their meter
+    types ('hh'/'nhh' are electricity, anything else gas). Returns a list
+    aligned with the input holding an error message or ``None``. Empty
+    identifiers are not errors.
+    """
+    count = len(identifiers)
+    if not count:
+        return []
+    ids = np.array([i or '' for i in identifiers], dtype='U32')
+    electricity = np.isin(np.array([t or '' for t in meter_types], dtype='U8'), ELECTRICITY_TYPES)
+    lengths = np.char.str_len(ids)
+    # str.isdigit also accepts non-ASCII digits such as superscripts
+    digits = np.char.isdigit(ids) & np.array([i.isascii() for i in ids.tolist()], dtype=bool)
+    present = lengths > 0
+
+    bad_mpan = present & electricity & ~(digits & (lengths == 13))
+    candidates = present & electricity & ~bad_mpan
+    bad_check = np.zeros(count, dtype=bool)
+    if candidates.any():
+        matrix = np.frombuffer(''.join(ids[candidates]).encode('ascii'), dtype=np.uint8).reshape(-1, 13) - 48
+        bad_check[candidates] = (matrix[:, :12] @ MPAN_WEIGHTS) % 10 != matrix[:, 12]
+    bad_mprn = present & ~electricity & ~(digits & (lengths >= 6) & (lengths <= 11))
+
+    errors = [None] * count
+    for index in np.flatnonzero(bad_mpan):
+        errors[index] = _('Electricity MPAN core must be 13 digits.')
+    for index in np.flatnonzero(bad_check):
+        errors[index] = _('Invalid MPAN check digit.')
+    for index in np.flatnonzero(bad_mprn):
+        errors[index] = _('Gas MPRN must be 6 to 11 digits.')
+    return errors
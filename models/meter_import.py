@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+import time
+from datetime import date, datetime
+
+import openpyxl
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from .hh_import import MAX_REPORTED_ERRORS, parse_date
+from .meter_ids import identifier_errors, normalise_identifier
+
+# Records created per batched create() call.
+METER_CREATE_BATCH = 1000
+
+METER_TYPE_ALIASES = {
+    'hh': 'hh', 'half-hourly': 'hh', 'half hourly': 'hh',
+    'nhh': 'nhh', 'non-half-hourly': 'nhh', 'non half hourly': 'nhh', 'electricity': 'nhh',
+    'gas': 'gas',
+}
+COLUMN_ALIASES = {
+    'mpan_mprn': ('mpan_mprn', 'mpan', 'mprn', 'mpan core', 'meter'),
+    'meter_type': ('meter_type', 'meter type', 'type'),
+    'site_name': ('site_name', 'site name', 'site'),
+    'street': ('street', 'address', 'supply address'),
+    'city': ('city', 'town'),
+    'zip': ('zip', 'postcode', 'post code'),
+    'annual_usage_kwh': ('annual_usage_kwh', 'annual usage', 'eac', 'aq', 'kwh'),
+    'kva': ('kva', 'capacity'),
+    'current_supplier': ('current_supplier', 'current supplier', 'supplier'),
+    'contract_end_date': ('contract_end_date', 'contract end', 'contract end date', 'ced'),
+}
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (date, datetime)):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores long identifiers as floats
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_sheet_rows(raw, file_format, aliases=COLUMN_ALIASES, required=('mpan_mprn',)):
+    """Yield ``(line_no, {column: value})`` from a CSV or XLSX sheet.
+
+    Header cells are mapped to keys through ``aliases``; unknown columns are
+    dropped. Rows are read lazily, so large files never sit in memory twice.
+    """
+    if file_format == 'xlsx':
+        workbook = openpyxl.load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
+        rows = ([_cell(v) for v in row] for row in workbook.active.iter_rows(values_only=True))
+    else:
+        rows = csv.reader(io.TextIOWrapper(io.BytesIO(raw), encoding='utf-8-sig', newline=''))
+    header = next(rows, None) or []
+    lookup = {alias: key for key, names in aliases.items() for alias in names}
+    columns = [lookup.get(str(h or '').strip().lower()) for h in header]
+    for key in required:
+        if key not in columns:
+            raise UserError(_('The file needs a column named one of: %s', ', '.join(aliases[key])))
+    for line_no, row in enumerate(rows, start=2):
+        values = {key: value for key, value in zip(columns, row) if key and value not in ('', None)}
+        if values:
+            yield line_no, values
+
+
+class EnergyMeterImport(models.TransientModel):
+    _name = 'energy.meter.import'
+    _description = 'Import Meters'
+
+    data_file = fields.Binary(string='File', required=True)
+    filename = fields.Char()
+    file_format = fields.Selection([('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', required=True)
+    partner_id = fields.Many2one('res.partner', string='Customer', required=True)
+    request_id = fields.Many2one('supplier.price.request', string='Add to Price Request',
+                                 help='Also add every imported meter as a line of this request.')
+    create_sites = fields.Boolean(default=True, help='Create a site for each meter the customer has no site for yet.')
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    rows_read = fields.Integer(readonly=True)
+    rows_rejected = fields.Integer(readonly=True)
+    meters_created = fields.Integer(readonly=True)
+    meters_existing = fields.Integer(string='Existing Meters', readonly=True)
+    sites_created = fields.Integer(readonly=True)
+    lines_created = fields.Integer(string='Request Lines Created', readonly=True)
+    duration_seconds = fields.Float(string='Duration (s)', readonly=True)
+    error_report = fields.Text(readonly=True)
+
+    @api.onchange('filename')
+    def _onchange_filename(self):
+        for rec in self:
+            if rec.filename and rec.filename.lower().endswith('.xlsx'):
+                rec.file_format = 'xlsx'
+
+    @api.onchange('request_id')
+    def _onchange_request_id(self):
+        for rec in self:
+            if rec.request_id.partner_id:
+                rec.partner_id = rec.request_id.partner_id
+
+    def action_import(self):
+        self.ensure_one()
+        started = time.perf_counter()
+        rows = iter_sheet_rows(base64.b64decode(self.data_file or b''), self.file_format)
+        stats = self._import_rows(rows)
+        self.write({
+            'state': 'done',
+            'rows_read': stats['read'],
+            'rows_rejected': stats['rejected'],
+            'meters_created': stats['meters_created'],
+            'meters_existing': stats['meters_existing'],
+            'sites_created': stats['sites_created'],
+            'lines_created': stats['lines_created'],
+            'duration_seconds': time.perf_counter() - started,
+            'error_report': '\n'.join(stats['errors']),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _import_rows(self, rows):
+        """Validate all rows at once, then create meters, sites and request lines in batches.
+
+        Invalid rows are reported and skipped; they never abort the import.
+        """
+        stats = {'read': 0, 'rejected': 0, 'errors': [], 'meters_created': 0, 'meters_existing': 0,
+                 'sites_created': 0, 'lines_created': 0}
+
+        def reject(line_no, message):
+            stats['rejected'] += 1
+            if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                stats['errors'].append(_('Line %(line)s: %(error)s', line=line_no, error=message))
+
+        parsed = []
+        for line_no, values in rows:
+            stats['read'] += 1
+            identifier = normalise_identifier(values.get('mpan_mprn'))
+            meter_type = values.get('meter_type')
+            if meter_type:
+                meter_type = METER_TYPE_ALIASES.get(str(meter_type).strip().lower())
+                if not meter_type:
+                    reject(line_no, _('Unknown meter type %s') % values['meter_type'])
+                    continue
+            elif identifier:
+                meter_type = 'nhh' if len(identifier) == 13 else 'gas'
+            if not identifier:
+                reject(line_no, _('Missing MPAN/MPRN'))
+                continue
+            try:
+                usage = float(values.get('annual_usage_kwh') or 0.0)
+                kva = float(values.get('kva') or 0.0)
+                end = values.get('contract_end_date')
+                if end and not isinstance(end, date):
+                    end = parse_date(str(end))
+                elif isinstance(end, datetime):
+                    end = end.date()
+            except ValueError as e:
+                reject(line_no, str(e))
+                continue
+            parsed.append((line_no, identifier, meter_type, usage, kva, end or False, values))
+
+        errors = identifier_errors([p[1] for p in parsed], [p[2] for p in parsed])
+        valid, seen = [], set()
+        for row, error in zip(parsed, errors):
+            if error:
+                reject(row[0], '%s: %s' % (row[1], error))
+            elif row[1] in seen:
+                reject(row[0], _('Duplicate meter %s in file') % row[1])
+            else:
+                seen.add(row[1])
+                valid.append(row)
+
+        supplier_names = {str(row[6]['current_supplier']) for row in valid if row[6].get('current_supplier')}
+        suppliers = {}
+        if supplier_names:
+            for partner in self.env['res.partner'].search_read([('name', 'in', list(supplier_names))], ['name']):
+                suppliers.setdefault(partner['name'], partner['id'])
+
+        meter_index = self.env['energy.hh.read']._get_meter_index()
+        Product = self.env['product.product']
+        new_rows = [row for row in valid if row[1] not in meter_index]
+        stats['meters_existing'] = len(valid) - len(new_rows)
+        for start in range(0, len(new_rows), METER_CREATE_BATCH):
+            batch = new_rows[start:start + METER_CREATE_BATCH]
+            meters = Product.create([{
+                'name': values.get('site_name') or identifier,
+                'is_energy_meter': True,
+                'mpan_mprn': identifier,
+                'meter_type': meter_type,
+                'default_annual_usage_kwh': usage,
+                'kva': kva,
+                'supply_address': values.get('street') or False,
+                'postcode': values.get('zip') or False,
+                'site_name': values.get('site_name') or False,
+                'current_supplier_id': suppliers.get(values.get('current_supplier'), False),
+                'contract_end_date': end,
+            } for line_no, identifier, meter_type, usage, kva, end, values in batch])
+            for row, meter in zip(batch, meters):
+                meter_index[row[1]] = meter.id
+            stats['meters_created'] += len(meters)
+
+        if self.create_sites:
+            Site = self.env['customer.site']
+            known = {s['meter_key'] for s in Site.search_read(
+                [('partner_id', '=', self.partner_id.id), ('meter_key', '!=', False)], ['meter_key'])}
+            site_rows = [row for row in valid if row[1] not in known]
+            for start in range(0, len(site_rows), METER_CREATE_BATCH):
+                batch = site_rows[start:start + METER_CREATE_BATCH]
+                Site.create([{
+                    'name': values.get('site_name') or values.get('street') or identifier,
+                    'partner_id': self.partner_id.id,
+                    'street': values.get('street') or False,
+                    'city': values.get('city') or False,
+                    'zip': values.get('zip') or False,
+                    'meter_type': meter_type,
+                    'mpan_mprn': identifier,
+                    'current_supplier_id': suppliers.get(values.get('current_supplier'), False),
+                    'contract_end_date': end,
+                    'annual_usage_kwh': usage,
+                    'kva': kva,
+                } for line_no, identifier, meter_type, usage, kva, end, values in batch])
+                stats['sites_created'] += len(batch)
+
+        if self.request_id:
+            Line = self.env['supplier.price.request.line']
+            for start in range(0, len(valid), METER_CREATE_BATCH):
+                batch = valid[start:start + METER_CREATE_BATCH]
+                Line.create([{
+                    'request_id': self.request_id.id,
+                    'product_id': meter_index[identifier],
+                    'mpan_mprn': identifier,
+                    'annual_usage_kwh': usage,
+                    'meter_type': meter_type if meter_type in ('hh', 'nhh') else False,
+                    'current_supplier_id': suppliers.get(values.get('current_supplier'), False),
+                    'contract_end_date': end,
+                    'supply_address': ', '.join(filter(None, (values.get('street'), values.get('city'), values.get('zip')))) or False,
+                } for line_no, identifier, meter_type, usage, kva, end, values in batch])
+                stats['lines_created'] += len(batch)
+        return stats
@@ -0,0 +1,105 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+from .meter_ids import normalise_identifier
+
+
+class CustomerSite(models.Model):
+    _inherit = 'customer.site'
+
+    meter_key = fields.Char(string='Meter Key', compute='_compute_meter_key', store=True, index='btree_not_null',
+                            help='Canonical MPAN/MPRN used for lookups.')
+
+    @api.depends('mpan_mprn')
+    def _compute_meter_key(self):
+        for rec in self:
+            rec.meter_key = normalise_identifier(rec.mpan_mprn)
+
+    # checked in Python rather than by a unique index, which could not be
+    # created over the duplicate MPANs older free-text data may hold
+    @api.constrains('partner_id', 'mpan_mprn')
+    def _check_partner_meter_key(self):
+        pairs = {(site.partner_id.id, site.meter_key) for site in self if site.meter_key}
+        if not pairs:
+            return
+        clashes = [
+            (partner, key) for partner, key in self._read_group(
+                [('meter_key', 'in', [key for __, key in pairs]), ('partner_id', 'in', self.partner_id.ids)],
+                ['partner_id', 'meter_key'], having=[('__count', '>', 1)])
+            if (partner.id, key) in pairs
+        ]
+        if clashes:
+            partner, key = clashes[0]
+            raise ValidationError(_('%(customer)s already has a site for MPAN/MPRN %(meter)s.',
+                                    customer=partner.display_name, meter=key))
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    meter_key = fields.Char(string='Meter Key', compute='_compute_meter_key', store=True, index='btree_not_null',
+                            help='Canonical MPAN/MPRN used for lookups.')
+
+    @api.depends('is_energy_meter', 'mpan_mprn', 'mpan_core', 'mprn')
+    def _compute_meter_key(self):
+        for rec in self:
+            rec.meter_key = rec.is_energy_meter and normalise_identifier(rec.mpan_mprn or rec.mpan_core or rec.mprn)
+
+    # see CustomerSite._check_partner_meter_key for why this is not a unique index
+    @api.constrains('is_energy_meter', 'mpan_mprn', 'mpan_core', 'mprn', 'active')
+    def _check_meter_key(self):
+        keys = [key for key in self.filtered('active').mapped('meter_key') if key]
+        if not keys:
+            return
+        clashes = self._read_group([('meter_key', 'in', keys)], ['meter_key'], having=[('__count', '>', 1)])
+        if clashes:
+            raise ValidationError(_('Another active meter already uses MPAN/MPRN %s.') % clashes[0][0])
+
+    @api.model
+    def _lookup_meters(self, identifiers):
+        """Resolve MPAN/MPRNs to everything the broker holds for them, in a fixed number of queries.
+
+        Returns ``{meter_key: {'meter_id', 'site_ids', 'request_ids', 'contract_id'}}``
+        for every non-empty identifier, whatever its spacing. ``request_ids``
+        are requests without a contract yet; ``contract_id`` is the contract
+        live today through any request quoting the meter.
+        """
+        keys = list({normalise_identifier(i) for i in identifiers} - {False})
+        result = {key: {'meter_id': False, 'site_ids': [], 'request_ids': [], 'contract_id': False} for key in keys}
+        if not keys:
+            return result
+        for meter in self.with_context(active_test=False).search_read(
+                [('meter_key', 'in', keys)], ['meter_key', 'active'], order='active desc, id'):
+            result[meter['meter_key']]['meter_id'] = result[meter['meter_key']]['meter_id'] or meter['id']
+        for site in self.env['customer.site'].search_read([('meter_key', 'in', keys)], ['meter_key']):
+            result[site['meter_key']]['site_ids'].append(site['id'])
+
+        keys_by_request = {}
+        for key, request in self.env['supplier.price.request.line']._read_group(
+                [('meter_key', 'in', keys)], ['meter_key', 'request_id']):
+            if not request:
+                continue
+            keys_by_request.setdefault(request.id, []).append(key)
+            if not request.contract_id:
+                result[key]['request_ids'].append(request.id)
+        if keys_by_request:
+            today = fields.Date.context_today(self)
+            for contract in self.env['customer.contract'].search_read([
+                    ('price_request_id', 'in', list(keys_by_request)),
+                    ('start_date', '<=', today),
+                    ('end_date', '>=', today),
+            ], ['price_request_id'], order='start_date desc', load=None):
+                for key in keys_by_request[contract['price_request_id']]:
+                    result[key]['contract_id'] = result[key]['contract_id'] or contract['id']
+        return result
+
+
+class SupplierPriceRequestLine(models.Model):
+    _inherit = 'supplier.price.request.line'
+
+    meter_key = fields.Char(string='Meter Key', compute='_compute_meter_key', store=True, index='btree_not_null')
+
+    @api.depends('mpan_mprn')
+    def _compute_meter_key(self):
+        for rec in self:
+            rec.meter_key = normalise_identifier(rec.mpan_mprn)
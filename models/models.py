@@ -2,11 +2,23 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 from dateutil.relativedelta import relativedelta
-import requests
 import json
 import base64
 import io
-import csv
+
+from .batching import iter_cron_batches
+from .meter_ids import check_identifiers
+from .sequence import reserve_sequence
+from .pricing_client import PricingClient, fan_out
+from .supplier_adapters import get_adapter
+
+# Days before contract end at which a renewal reminder activity is scheduled.
+EXPIRY_REMINDER_DAYS = (90, 60, 30)
+# Queued price requests priced per cron run.
+PRICING_BATCH_SIZE = 500
+# Response lines created per batch when mapping streamed offers.
+MAP_CREATE_BATCH = 1000
+MAP_REPORTED_ERRORS = 50
 
 
 class CustomerLoa(models.Model):
@@ -44,14 +56,13 @@ class CustomerLoa(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                seq = self.env['ir.sequence'].next_by_code('customer.loa') or _('New')
-                partner_name = ''
-                if vals.get('partner_id'):
-                    partner = self.env['res.partner'].browse(vals['partner_id'])
-                    partner_name = partner.display_name
-                vals['name'] = ('%s - %s' % (seq, partner_name)) if partner_name else seq
+        unnamed = [vals for vals in vals_list if vals.get('name', _('New')) == _('New')]
+        names = reserve_sequence(self.env, 'customer.loa', len(unnamed))
+        partners = self.env['res.partner'].browse({vals['partner_id'] for vals in unnamed if vals.get('partner_id')})
+        partner_names = {p.id: p.display_name for p in partners}
+        for vals, seq in zip(unnamed, names or [_('New')] * len(unnamed)):
+            partner_name = partner_names.get(vals.get('partner_id'), '')
+            vals['name'] = ('%s - %s' % (seq, partner_name)) if partner_name else seq
         return super().create(vals_list)
 
     def action_send_for_signature(self):
@@ -73,207 +84,6 @@ class CustomerLoa(models.Model):
                 except Exception:
                     pass
 
-    def action_fetch_jellyfish_prices(self):
-        for rec in self:
-            ICP = self.env['ir.config_parameter'].sudo()
-            base_url = ICP.get_param('energy_broker_uk.jellyfish_api_base_url')
-            api_key = ICP.get_param('energy_broker_uk.jellyfish_api_key')
-            if not base_url or not api_key:
-                raise ValidationError(_('Please configure Jellyfish API Base URL and Key in Energy Settings.'))
-            payload = {
-                'customer': rec.partner_id and rec.partner_id.display_name,
-                'meters': []
-            }
-            for line in rec.line_ids:
-                payload['meters'].append({
-                    'identifier': line.mpan_mprn,
-                    'type': line.meter_type or '',
-                    'annual_usage_kwh': line.annual_usage_kwh or 0.0,
-                    'supply_address': line.supply_address or '',
-                })
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json',
-            }
-            try:
-                resp = requests.post(base_url.rstrip('/') + '/pricing/quotes', data=json.dumps(payload), headers=headers, timeout=30)
-            except Exception as e:
-                raise ValidationError(_('Failed to reach Jellyfish API: %s') % e)
-            # Attach request payload for traceability
-            attachment = self.env['ir.attachment'].create({
-                'name': f'jellyfish_request_{rec.name}.json',
-                'type': 'binary',
-                'datas': base64.b64encode(json.dumps(payload, indent=2).encode('utf-8')),
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'application/json',
-            })
-            rec.attachment_ids = [(4, attachment.id)]
-            # Attach response payload
-            att2 = self.env['ir.attachment'].create({
-                'name': f'jellyfish_response_{rec.name}.json',
-                'type': 'binary',
-                'datas': base64.b64encode(resp.text.encode('utf-8')),
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'application/json',
-            })
-            rec.attachment_ids = [(4, att2.id)]
-            # Ensure supplier record exists for traceability
-            partner = self.env['res.partner'].search([('name', '=', 'Jellyfish Energy')], limit=1)
-            if not partner:
-                partner = self.env['res.partner'].create({'name': 'Jellyfish Energy', 'is_energy_supplier': True, 'supplier_rank': 1})
-            self.env['supplier.price.response'].create({
-                'request_id': rec.id,
-                'partner_id': partner.id,
-                'notes': _('Jellyfish API response attached as JSON. Please review and map rates.'),
-            })
-
-    def _get_latest_jellyfish_response_json(self):
-        self.ensure_one()
-        atts = self.attachment_ids.filtered(lambda a: a.name and a.name.startswith('jellyfish_response_') and a.mimetype == 'application/json')
-        if not atts:
-            # search globally if not linked in many2many
-            atts = self.env['ir.attachment'].search([
-                ('res_model', '=', self._name),
-                ('res_id', '=', self.id),
-                ('name', 'ilike', 'jellyfish_response_'),
-                ('mimetype', '=', 'application/json')
-            ], order='id desc', limit=1)
-        else:
-            atts = atts.sorted(key=lambda a: a.id, reverse=True)[0]
-        if not atts:
-            return None
-        data = base64.b64decode(atts.datas or b'{}').decode('utf-8')
-        try:
-            return json.loads(data)
-        except Exception:
-            return None
-
-    def action_map_jellyfish_offers(self):
-        for req in self:
-            data = req._get_latest_jellyfish_response_json()
-            if not data:
-                raise ValidationError(_('No Jellyfish JSON response attachment found to map.'))
-            partner = self.env['res.partner'].search([('name', '=', 'Jellyfish Energy')], limit=1)
-            if not partner:
-                partner = self.env['res.partner'].create({'name': 'Jellyfish Energy', 'is_energy_supplier': True, 'supplier_rank': 1})
-            response = self.env['supplier.price.response'].create({
-                'request_id': req.id,
-                'partner_id': partner.id,
-                'lead_id': req.lead_id.id,
-                'notes': _('Auto-mapped from Jellyfish API response.'),
-            })
-            # try common shapes: {'offers': [...]}, {'quotes': [...]}, or list
-            offers = []
-            if isinstance(data, dict):
-                for key in ('offers', 'quotes', 'results'):
-                    if key in data and isinstance(data[key], list):
-                        offers = data[key]
-                        break
-            elif isinstance(data, list):
-                offers = data
-            # build index by identifier
-            lines_by_identifier = {l.mpan_mprn.replace(' ', ''): l for l in req.line_ids if l.mpan_mprn}
-            for item in offers:
-                try:
-                    ident = (item.get('identifier') or item.get('mpan') or item.get('mprn') or '').replace(' ', '')
-                    req_line = lines_by_identifier.get(ident)
-                    if not req_line:
-                        continue
-                    term_years = item.get('term_years') or (item.get('term_months') and int(item.get('term_months')/12)) or 1
-                    unit_rate = item.get('unit_rate_p_per_kwh') or item.get('unit_rate_ppkwh') or item.get('unit_rate')
-                    standing = item.get('standing_charge_gbp_per_day') or item.get('standing_charge_per_day') or item.get('standing')
-                    self.env['supplier.price.response.line'].create({
-                        'response_id': response.id,
-                        'request_line_id': req_line.id,
-                        'unit_rate_p_per_kwh': float(unit_rate or 0.0),
-                        'standing_charge_gbp_per_day': float(standing or 0.0),
-                        'contract_term_years': int(term_years or 1),
-                    })
-                except Exception:
-                    continue
-
-    def action_send_customer_quote(self):
-        for rec in self:
-            if not rec.partner_id or not rec.partner_id.email:
-                raise ValidationError(_('Customer email is required to send quotation.'))
-            report = self.env.ref('energy_broker_uk.action_supplier_price_request_report')
-            pdf = report._render_qweb_pdf([rec.id])[0]
-            attachment = self.env['ir.attachment'].create({
-                'name': f"{rec.name}_comparison.pdf",
-                'type': 'binary',
-                'datas': base64.b64encode(pdf),
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'application/pdf',
-            })
-            mail = self.env['mail.mail'].create({
-                'subject': _('Energy Pricing Comparison: %s') % (rec.name,),
-                'body_html': _('<p>Please find attached your energy pricing comparison.</p>'),
-                'email_to': rec.partner_id.email,
-                'attachment_ids': [(4, attachment.id)],
-            })
-            try:
-                mail.send()
-            except Exception:
-                pass
-
-    def action_fetch_jellyfish_prices(self):
-        for rec in self:
-            ICP = self.env['ir.config_parameter'].sudo()
-            base_url = ICP.get_param('energy_broker_uk.jellyfish_api_base_url')
-            api_key = ICP.get_param('energy_broker_uk.jellyfish_api_key')
-            if not base_url or not api_key:
-                raise ValidationError(_('Please configure Jellyfish API Base URL and Key in Energy Settings.'))
-            payload = {
-                'customer': rec.partner_id and rec.partner_id.display_name,
-                'meters': []
-            }
-            for line in rec.line_ids:
-                payload['meters'].append({
-                    'identifier': line.mpan_mprn,
-                    'type': line.meter_type or '',
-                    'annual_usage_kwh': line.annual_usage_kwh or 0.0,
-                    'supply_address': line.supply_address or '',
-                })
-            headers = {
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json',
-            }
-            try:
-                resp = requests.post(base_url.rstrip('/') + '/pricing/quotes', data=json.dumps(payload), headers=headers, timeout=30)
-            except Exception as e:
-                raise ValidationError(_('Failed to reach Jellyfish API: %s') % e)
-            attachment = self.env['ir.attachment'].create({
-                'name': f'jellyfish_request_{rec.name}.json',
-                'type': 'binary',
-                'datas': base64.b64encode(json.dumps(payload, indent=2).encode('utf-8')),
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'application/json',
-            })
-            rec.attachment_ids = [(4, attachment.id)]
-            att2 = self.env['ir.attachment'].create({
-                'name': f'jellyfish_response_{rec.name}.json',
-                'type': 'binary',
-                'datas': base64.b64encode(resp.text.encode('utf-8')),
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'application/json',
-            })
-            rec.attachment_ids = [(4, att2.id)]
-            partner = self.env['res.partner'].search([('name', '=', 'Jellyfish Energy')], limit=1)
-            if not partner:
-                partner = self.env['res.partner'].create({'name': 'Jellyfish Energy', 'is_energy_supplier': True, 'supplier_rank': 1})
-            self.env['supplier.price.response'].create({
-                'request_id': rec.id,
-                'partner_id': partner.id,
-                'notes': _('Jellyfish API response attached as JSON. Please review and map rates.'),
-            })
-
-    
-
     def name_get(self):
         result = []
         for rec in self:
@@ -305,8 +115,8 @@ class CustomerLoa(models.Model):
     def cron_update_loa_status(self):
         today = fields.Date.today()
         expired = self.search([('expiry_date', '<', today), ('status', '!=', 'expired')])
-        for rec in expired:
-            rec.status = 'expired'
+        for batch in iter_cron_batches(expired):
+            batch.write({'status': 'expired'})
 
 
 class SupplierPriceRequest(models.Model):
@@ -334,6 +144,14 @@ class SupplierPriceRequest(models.Model):
     contract_id = fields.Many2one('customer.contract', string='Contract')
     can_create_contract = fields.Boolean(compute='_compute_can_create_contract')
 
+    pricing_state = fields.Selection([
+        ('none', 'Not Requested'),
+        ('queued', 'Queued'),
+        ('done', 'Received'),
+        ('error', 'Failed'),
+    ], string='API Pricing', default='none', copy=False, readonly=True, index=True)
+    pricing_error = fields.Char(string='Pricing Error', copy=False, readonly=True)
+
     @api.depends('line_ids', 'line_ids.annual_usage_kwh')
     def _compute_can_create_contract(self):
         for rec in self:
@@ -341,13 +159,14 @@ class SupplierPriceRequest(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        records = super().create(vals_list)
-        for rec in records:
-            if rec.name == _('New') or rec.name.startswith(_('New')):
-                seq = self.env['ir.sequence'].next_by_code('supplier.price.request') or _('New')
-                partner_name = rec.partner_id.display_name if rec.partner_id else (rec.loa_id.partner_id.display_name if rec.loa_id else '')
-                rec.name = ('%s - %s' % (seq, partner_name)) if partner_name else seq
-        return records
+        unnamed = [vals for vals in vals_list if (vals.get('name') or _('New')).startswith(_('New'))]
+        names = reserve_sequence(self.env, 'supplier.price.request', len(unnamed))
+        loas = self.env['customer.loa'].browse({vals['loa_id'] for vals in unnamed if vals.get('loa_id')})
+        partner_names = {loa.id: loa.partner_id.display_name for loa in loas}
+        for vals, seq in zip(unnamed, names or [_('New')] * len(unnamed)):
+            partner_name = partner_names.get(vals.get('loa_id'), '')
+            vals['name'] = ('%s - %s' % (seq, partner_name)) if partner_name else seq
+        return super().create(vals_list)
 
     def action_send(self):
         for rec in self:
@@ -369,47 +188,255 @@ class SupplierPriceRequest(models.Model):
                     if ids:
                         rec.supplier_ids = [(6, 0, ids)]
 
-    def action_send_tender_emails(self):
+    def action_fetch_supplier_prices(self):
+        """Queue the requests for API pricing; the pricing cron does the HTTP work."""
         for rec in self:
-            if not rec.supplier_ids:
-                raise ValidationError(_('Please select at least one supplier.'))
-            buf = io.StringIO()
-            writer = csv.writer(buf)
-            writer.writerow(['MPAN/MPRN', 'Annual Usage (kWh)', 'Current Supplier', 'Contract End', 'Meter Type', 'Supply Address'])
-            for line in rec.line_ids:
-                writer.writerow([
-                    line.mpan_mprn or '',
-                    line.annual_usage_kwh or 0.0,
-                    line.current_supplier_id.display_name if line.current_supplier_id else '',
-                    line.contract_end_date or '',
-                    line.meter_type or '',
-                    line.supply_address or '',
-                ])
-            data = base64.b64encode(buf.getvalue().encode('utf-8'))
-            attachment = self.env['ir.attachment'].create({
-                'name': f"tender_{rec.name}.csv",
-                'type': 'binary',
-                'datas': data,
-                'res_model': rec._name,
-                'res_id': rec.id,
-                'mimetype': 'text/csv',
+            if not rec._get_pricing_suppliers():
+                raise ValidationError(_('None of the target suppliers of %s has a pricing API configured.') % rec.name)
+        self.write({'pricing_state': 'queued', 'pricing_error': False})
+        self.env.ref('energy_broker_uk.ir_cron_fetch_supplier_prices')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _('%s price request(s) queued for pricing.') % len(self),
+            },
+        }
+
+    def cron_fetch_queued_prices(self):
+        queued = self.search([('pricing_state', '=', 'queued')], limit=PRICING_BATCH_SIZE)
+        if queued:
+            queued._fetch_supplier_prices_now()
+        if self.search_count([('pricing_state', '=', 'queued')], limit=1):
+            self.env.ref('energy_broker_uk.ir_cron_fetch_supplier_prices')._trigger()
+
+    def _get_pricing_suppliers(self):
+        self.ensure_one()
+        suppliers = self.env['res.partner']
+        for supplier in self.supplier_ids.filtered('pricing_adapter'):
+            adapter = get_adapter(supplier.pricing_adapter)
+            if adapter and adapter.credentials(supplier)[0]:
+                suppliers |= supplier
+        return suppliers
+
+    def _prepare_offer_line_vals(self, response, offers):
+        """Match normalised adapter offers to this request's meters.
+
+        Returns ``(vals_list, unmatched)`` for ``supplier.price.response.line``.
+        """
+        self.ensure_one()
+        lines_by_identifier = {l.meter_key: l.id for l in self.line_ids if l.meter_key}
+        vals_list, unmatched = [], 0
+        for offer in offers:
+            line_id = lines_by_identifier.get(offer['identifier'])
+            if not line_id:
+                unmatched += 1
+                continue
+            vals_list.append({
+                'response_id': response.id,
+                'request_line_id': line_id,
+                'unit_rate_p_per_kwh': offer['unit_rate_p_per_kwh'],
+                'standing_charge_gbp_per_day': offer['standing_charge_gbp_per_day'],
+                'contract_term_years': offer['contract_term_years'],
+                'kva_price': offer['kva_price'],
             })
-            subject = _('Tender Request: %s') % (rec.name,)
-            body = _('<p>Please find attached the meter list for tendering.</p>')
-            for supplier in rec.supplier_ids:
-                email = supplier.tender_email or supplier.email
-                if not email:
-                    continue
-                mail = self.env['mail.mail'].create({
-                    'subject': subject,
-                    'body_html': body,
-                    'email_to': email,
-                    'attachment_ids': [(4, attachment.id)],
-                })
+        return vals_list, unmatched
+
+    def _fetch_supplier_prices_now(self):
+        """Fan every request in ``self`` out to all of its API-enabled suppliers at once."""
+        Partner = self.env['res.partner']
+        clients, jobs = {}, {}
+        for rec in self:
+            for supplier in rec._get_pricing_suppliers():
+                adapter = get_adapter(supplier.pricing_adapter)
+                if supplier.id not in clients:
+                    clients[supplier.id] = PricingClient(*adapter.credentials(supplier))
+                jobs[(rec.id, supplier.id)] = (clients[supplier.id], adapter.quote_path, adapter.build_payload(rec))
+        try:
+            results = fan_out(jobs)
+        finally:
+            for client in clients.values():
+                client.close()
+
+        attachment_vals, call_vals, offers_by_key, errors = [], [], {}, {}
+        response_attachment_index = {}
+        for (req_id, supplier_id), result in results.items():
+            rec, supplier = self.browse(req_id), Partner.browse(supplier_id)
+            adapter = get_adapter(supplier.pricing_adapter)
+            offers, error = None, result.error
+            if result.ok:
                 try:
-                    mail.send()
-                except Exception:
-                    pass
+                    offers = adapter.parse_response(result.text)
+                except (ValueError, TypeError, KeyError, AttributeError) as e:
+                    error = _('Unparseable response: %s') % e
+            # only a parsed response is named so that offer mapping picks it up
+            response_kind = 'response' if offers is not None else 'error'
+            for kind, content in (('request', json.dumps(jobs[(req_id, supplier_id)][2], indent=2)), (response_kind, result.text)):
+                if content:
+                    if kind == 'response':
+                        response_attachment_index[(req_id, supplier_id)] = len(attachment_vals)
+                    is_error = kind == 'error'
+                    attachment_vals.append({
+                        'name': f"{adapter.code}_{kind}_{rec.name}.{'txt' if is_error else 'json'}",
+                        'type': 'binary',
+                        'datas': base64.b64encode(content.encode('utf-8')),
+                        'res_model': rec._name,
+                        'res_id': rec.id,
+                        'mimetype': 'text/plain' if is_error else 'application/json',
+                    })
+            call_vals.append({
+                'request_id': req_id,
+                'partner_id': supplier_id,
+                'adapter': adapter.code,
+                'ok': offers is not None,
+                'status_code': result.status or 0,
+                'latency_ms': result.latency * 1000.0,
+                'offer_count': len(offers or []),
+                'error': error,
+            })
+            if offers is None:
+                errors.setdefault(req_id, []).append('%s: %s' % (supplier.display_name, error))
+            else:
+                offers_by_key[(req_id, supplier_id)] = offers
+
+        attachments = self.env['ir.attachment'].create(attachment_vals)
+        for rec in self:
+            rec.attachment_ids = [(4, att.id) for att in attachments if att.res_id == rec.id]
+
+        keys = list(offers_by_key)
+        responses = self.env['supplier.price.response'].create([{
+            'request_id': req_id,
+            'partner_id': supplier_id,
+            'lead_id': self.browse(req_id).lead_id.id,
+            'source_attachment_id': attachments[response_attachment_index[(req_id, supplier_id)]].id,
+            'notes': _('Imported from %s pricing API.') % Partner.browse(supplier_id).display_name,
+        } for req_id, supplier_id in keys])
+        line_vals = []
+        for response, key in zip(responses, keys):
+            line_vals += self.browse(key[0])._prepare_offer_line_vals(response, offers_by_key[key])[0]
+        self.env['supplier.price.response.line'].create(line_vals)
+        self.env['supplier.pricing.call'].create(call_vals)
+
+        priced = self.browse({key[0] for key in keys})
+        priced.write({'pricing_state': 'done', 'pricing_error': False})
+        for rec in self - priced:
+            rec.write({'pricing_state': 'error', 'pricing_error': '; '.join(errors.get(rec.id, [])) or _('No supplier returned prices.')})
+
+    def _get_latest_response_attachment(self, adapter):
+        """Latest JSON pricing response of ``adapter`` attached to this request."""
+        self.ensure_one()
+        return self.env['ir.attachment'].search([
+            '|', ('id', 'in', self.attachment_ids.ids),
+            '&', ('res_model', '=', self._name), ('res_id', '=', self.id),
+            ('name', '=like', '%s_response_%%' % adapter.code),
+            ('mimetype', '=', 'application/json'),
+        ], order='id desc', limit=1)
+
+    def _map_offers_stream(self, response, fileobj, adapter):
+        """Stream offers from ``fileobj`` into lines of ``response``, ``MAP_CREATE_BATCH`` per create.
+
+        Returns a mapping report dict with matched, unmatched and rejected
+        counts and the first ``MAP_REPORTED_ERRORS`` rejection reasons.
+        """
+        self.ensure_one()
+        Line = self.env['supplier.price.response.line']
+        lines_by_identifier = {l.meter_key: l.id for l in self.line_ids if l.meter_key}
+        report = {'matched': 0, 'unmatched': 0, 'rejected': 0, 'errors': []}
+        vals_list = []
+        for offer, error in adapter.iter_offers(fileobj):
+            if error:
+                report['rejected'] += 1
+                if len(report['errors']) < MAP_REPORTED_ERRORS:
+                    report['errors'].append(error)
+                continue
+            line_id = lines_by_identifier.get(offer['identifier'])
+            if not line_id:
+                report['unmatched'] += 1
+                continue
+            report['matched'] += 1
+            vals_list.append({
+                'response_id': response.id,
+                'request_line_id': line_id,
+                'unit_rate_p_per_kwh': offer['unit_rate_p_per_kwh'],
+                'standing_charge_gbp_per_day': offer['standing_charge_gbp_per_day'],
+                'contract_term_years': offer['contract_term_years'],
+                'kva_price': offer['kva_price'],
+            })
+            if len(vals_list) >= MAP_CREATE_BATCH:
+                Line.create(vals_list)
+                vals_list = []
+        Line.create(vals_list)
+        return report
+
+    def action_map_supplier_offers(self):
+        """Map the latest JSON response of each API-enabled supplier into a price response.
+
+        Suppliers are resolved by their pricing adapter. A response already
+        built from the same attachment (by the pricing cron or an earlier
+        mapping) is refilled rather than duplicated.
+        """
+        Response = self.env['supplier.price.response']
+        totals = dict.fromkeys(('matched', 'unmatched', 'rejected'), 0)
+        for req in self:
+            sources = []
+            for supplier in req.supplier_ids.filtered('pricing_adapter'):
+                adapter = get_adapter(supplier.pricing_adapter)
+                attachment = adapter and req._get_latest_response_attachment(adapter)
+                if attachment:
+                    sources.append((supplier, adapter, attachment))
+            if not sources:
+                raise ValidationError(_('No supplier JSON response attachment found to map on %s.') % req.name)
+            existing = {
+                (r.partner_id.id, r.source_attachment_id.id): r
+                for r in Response.search([
+                    ('request_id', '=', req.id),
+                    ('source_attachment_id', 'in', [attachment.id for __, __, attachment in sources]),
+                ])
+            }
+            for supplier, adapter, attachment in sources:
+                response = existing.get((supplier.id, attachment.id))
+                if response:
+                    response.line_ids.unlink()
+                else:
+                    response = Response.create({
+                        'request_id': req.id,
+                        'partner_id': supplier.id,
+                        'lead_id': req.lead_id.id,
+                        'source_attachment_id': attachment.id,
+                        'notes': _('Auto-mapped from %s API response.') % adapter.label,
+                    })
+                if attachment.store_fname:
+                    fileobj = open(attachment._full_path(attachment.store_fname), 'rb')
+                else:
+                    fileobj = io.BytesIO(attachment.raw or b'[]')
+                try:
+                    with fileobj:
+                        report = req._map_offers_stream(response, fileobj, adapter)
+                except ValueError as e:
+                    raise ValidationError(_('Could not read %(name)s: %(error)s', name=attachment.name, error=e))
+                for key in totals:
+                    totals[key] += report[key]
+                body = _('Mapped %(file)s: %(matched)s matched, %(unmatched)s unmatched, %(rejected)s rejected.',
+                         file=attachment.name, **{key: report[key] for key in totals})
+                if report['errors']:
+                    body += '\n' + '\n'.join(report['errors'])
+                req.message_post(body=body)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'warning' if totals['unmatched'] or totals['rejected'] else 'success',
+                'message': _('%(matched)s offers mapped, %(unmatched)s unmatched, %(rejected)s rejected.', **totals),
+            },
+        }
+
+    def action_update_usage_from_hh(self):
+        lines = self.line_ids.filtered('product_id')
+        usage = lines.product_id._get_tender_usage()
+        for line in lines:
+            if usage.get(line.product_id.id):
+                line.annual_usage_kwh = usage[line.product_id.id]
 
 
 class SupplierPriceRequestLine(models.Model):
@@ -433,7 +460,8 @@ class SupplierPriceRequestLine(models.Model):
         for rec in self:
             if rec.product_id and getattr(rec.product_id, 'is_energy_meter', False):
                 rec.mpan_mprn = rec.product_id.mpan_mprn or rec.mpan_mprn
-                rec.annual_usage_kwh = rec.product_id.default_annual_usage_kwh or rec.annual_usage_kwh
+                hh_usage = rec.product_id._get_tender_usage().get(rec.product_id.id)
+                rec.annual_usage_kwh = hh_usage or rec.product_id.default_annual_usage_kwh or rec.annual_usage_kwh
                 if rec.product_id.meter_type in ('hh', 'nhh'):
                     rec.meter_type = rec.product_id.meter_type
                 elif rec.product_id.meter_type == 'gas':
@@ -442,21 +470,7 @@ class SupplierPriceRequestLine(models.Model):
 
     @api.constrains('mpan_mprn', 'meter_type')
     def _check_mpan_mprn(self):
-        for rec in self:
-            if not rec.mpan_mprn:
-                continue
-            val = rec.mpan_mprn.replace(' ', '')
-            if rec.meter_type in ('hh', 'nhh'):
-                if not val.isdigit() or len(val) != 13:
-                    raise ValidationError(_('Electricity MPAN core must be 13 digits.'))
-                weights = [3, 7, 1] * 4
-                total = sum(int(d) * w for d, w in zip(val[:12], weights))
-                check = total % 10
-                if check != int(val[12]):
-                    raise ValidationError(_('Invalid MPAN check digit.'))
-            else:
-                if not val.isdigit() or not (6 <= len(val) <= 11):
-                    raise ValidationError(_('Gas MPRN must be 6 to 11 digits.'))
+        check_identifiers(self)
 
 
 class SupplierPriceResponse(models.Model):
@@ -470,11 +484,12 @@ class SupplierPriceResponse(models.Model):
     partner_id = fields.Many2one('res.partner', string='Supplier', domain=[('supplier_rank', '>', 0)], required=True)
     line_ids = fields.One2many('supplier.price.response.line', 'response_id', string='Response Lines')
     attachment_ids = fields.Many2many('ir.attachment', string='Quote Attachments')
+    source_attachment_id = fields.Many2one('ir.attachment', string='Source API Response', copy=False, readonly=True,
+                                           ondelete='set null', help='Supplier API response the offer lines were mapped from.')
     notes = fields.Text(string='Notes')
 
     total_annual_cost = fields.Monetary(string='Total Annual Cost', compute='_compute_total', currency_field='currency_id', store=True)
     currency_id = fields.Many2one('res.currency', default=lambda self: self.env.company.currency_id.id)
-    is_best_offer = fields.Boolean(string='Best Offer')
 
     @api.depends('line_ids', 'line_ids.annual_cost')
     def _compute_total(self):
@@ -483,9 +498,9 @@ class SupplierPriceResponse(models.Model):
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('supplier.price.response') or _('New')
+        unnamed = [vals for vals in vals_list if vals.get('name', _('New')) == _('New')]
+        for vals, seq in zip(unnamed, reserve_sequence(self.env, 'supplier.price.response', len(unnamed)) or [_('New')] * len(unnamed)):
+            vals['name'] = seq
         return super().create(vals_list)
 
     @api.onchange('request_id')
@@ -570,14 +585,23 @@ class CustomerContract(models.Model):
     uplift_p_per_kwh = fields.Float(string='Uplift (p/kWh)', groups='energy_broker_uk.group_energy_broker_manager')
     commission_amount = fields.Monetary(string='Estimated Commission', compute='_compute_commission', currency_field='currency_id', store=True, groups='energy_broker_uk.group_energy_broker_manager')
     currency_id = fields.Many2one('res.currency', default=lambda self: self.env.company.currency_id.id)
+    expiry_reminder_days = fields.Integer(string='Last Expiry Reminder (days)', copy=False, readonly=True)
 
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get('name', _('New')) == _('New'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('customer.contract') or _('New')
+        unnamed = [vals for vals in vals_list if vals.get('name', _('New')) == _('New')]
+        for vals, seq in zip(unnamed, reserve_sequence(self.env, 'customer.contract', len(unnamed)) or [_('New')] * len(unnamed)):
+            vals['name'] = seq
         return super().create(vals_list)
 
+    def write(self, vals):
+        # an extended or renewed-in-place contract is reminded afresh for its new end date
+        moved = self.filtered(lambda c: c.end_date != fields.Date.to_date(vals['end_date'])) if 'end_date' in vals else self.browse()
+        res = super().write(vals)
+        if moved:
+            moved.write({'expiry_reminder_days': 0})
+        return res
+
     @api.onchange('price_response_id')
     def _onchange_price_response(self):
         for rec in self:
@@ -607,12 +631,36 @@ class CustomerContract(models.Model):
             rec.commission_amount = (usage * (rec.uplift_p_per_kwh or 0.0)) / 100.0
 
     def cron_send_expiry_reminders(self):
+        """Schedule a reminder when a contract enters each EXPIRY_REMINDER_DAYS window.
+
+        Contracts are selected by end date range, so a day the cron does not
+        run is caught up on the next run instead of being skipped.
+        """
         today = fields.Date.today()
-        for days in (90, 60, 30):
-            target = today + relativedelta(days=days)
-            contracts = self.search([('end_date', '=', target)])
-            for cont in contracts:
-                cont.activity_schedule('mail.mail_activity_data_todo', summary=_('Contract expiring in %s days') % days)
+        contracts = self.search([
+            ('end_date', '>=', today),
+            ('end_date', '<=', today + relativedelta(days=max(EXPIRY_REMINDER_DAYS))),
+        ])
+
+        def threshold(contract):
+            days_left = (contract.end_date - today).days
+            return min(d for d in EXPIRY_REMINDER_DAYS if days_left <= d)
+
+        due = contracts.filtered(lambda c: not c.expiry_reminder_days or c.expiry_reminder_days > threshold(c))
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        res_model_id = self.env['ir.model']._get_id(self._name)
+        user_id = activity_type.default_user_id.id or self.env.uid
+        for batch in iter_cron_batches(due):
+            self.env['mail.activity'].create([{
+                'res_model_id': res_model_id,
+                'res_id': cont.id,
+                'activity_type_id': activity_type.id,
+                'summary': _('Contract expiring in %s days') % (cont.end_date - today).days,
+                'date_deadline': today,
+                'user_id': user_id,
+            } for cont in batch])
+            for days, conts in batch.grouped(threshold).items():
+                conts.write({'expiry_reminder_days': days})
 
     def action_send_for_signature(self):
         for rec in self:
@@ -650,62 +698,3 @@ class CustomerContract(models.Model):
                 if hasattr(rec, 'status'):
                     rec.status = 'signed'
 
-
-class CrmLead(models.Model):
-    _inherit = 'crm.lead'
-
-    loa_count = fields.Integer(compute='_compute_energy_counts')
-    request_count = fields.Integer(compute='_compute_energy_counts')
-    response_count = fields.Integer(compute='_compute_energy_counts')
-    contract_count = fields.Integer(compute='_compute_energy_counts')
-
-    def _compute_energy_counts(self):
-        for rec in self:
-            rec.loa_count = self.env['customer.loa'].search_count([('lead_id', '=', rec.id)])
-            rec.request_count = self.env['supplier.price.request'].search_count([('lead_id', '=', rec.id)])
-            rec.response_count = self.env['supplier.price.response'].search_count([('lead_id', '=', rec.id)])
-            rec.contract_count = self.env['customer.contract'].search_count([('lead_id', '=', rec.id)])
-
-    def action_open_lead_loas(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': _('LOAs'),
-            'res_model': 'customer.loa',
-            'view_mode': 'list,form',
-            'domain': [('lead_id', '=', self.id)],
-            'context': {'default_lead_id': self.id, 'default_partner_id': self.partner_id.id if self.partner_id else False},
-        }
-
-    def action_open_lead_requests(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': _('Price Requests'),
-            'res_model': 'supplier.price.request',
-            'view_mode': 'list,form',
-            'domain': [('lead_id', '=', self.id)],
-            'context': {'default_lead_id': self.id},
-        }
-
-    def action_open_lead_responses(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': _('Supplier Responses'),
-            'res_model': 'supplier.price.response',
-            'view_mode': 'list,form',
-            'domain': [('lead_id', '=', self.id)],
-            'context': {'default_lead_id': self.id},
-        }
-
-    def action_open_lead_contracts(self):
-        self.ensure_one()
-        return {
-            'type': 'ir.actions.act_window',
-            'name': _('Contracts'),
-            'res_model': 'customer.contract',
-            'view_mode': 'list,form',
-            'domain': [('lead_id', '=', self.id)],
-            'context': {'default_lead_id': self.id, 'default_partner_id': self.partner_id.id if self.partner_id else False},
-        }
@@ -0,0 +1,147 @@
+from odoo import models, fields, api
+
+
+def dense_rank(sort_keys):
+    """Rank ``{key: sort_key}`` ascending, 1 being best; equal sort keys share a rank."""
+    ranks = {}
+    rank, previous = 0, object()
+    for key, sort_key in sorted(sort_keys.items(), key=lambda item: item[1]):
+        if sort_key != previous:
+            rank += 1
+            previous = sort_key
+        ranks[key] = rank
+    return ranks
+
+
+def rank_responses(rows):
+    """Rank one request's responses from ``{response_id: (meters_quoted, total, total_with_uplift)}``.
+
+    Responses quoting more of the request's meters always rank ahead, so a
+    cheap partial quote never beats a complete one. Returns
+    ``({response_id: rank}, {response_id: rank_with_uplift})``.
+    """
+    return (
+        dense_rank({key: (-meters, total) for key, (meters, total, uplifted) in rows.items()}),
+        dense_rank({key: (-meters, uplifted) for key, (meters, total, uplifted) in rows.items()}),
+    )
+
+
+class SupplierPriceRequest(models.Model):
+    _inherit = 'supplier.price.request'
+
+    response_ids = fields.One2many('supplier.price.response', 'request_id', string='Responses')
+
+    def _get_offer_comparison(self):
+        """Return ``{request_id: responses sorted by rank}`` for all requests in ``self``.
+
+        Responses and their lines are fetched with one search each, so the
+        comparison report renders without per-request queries.
+        """
+        responses = self.env['supplier.price.response'].search(
+            [('request_id', 'in', self.ids)], order='request_id, rank, total_annual_cost, id')
+        responses.line_ids.fetch(['contract_term_years', 'unit_rate_p_per_kwh', 'standing_charge_gbp_per_day'])
+        comparison = {request_id: responses.browse() for request_id in self.ids}
+        for request, group in responses.grouped('request_id').items():
+            comparison[request.id] = group
+        return comparison
+
+
+class SupplierPriceRequestLine(models.Model):
+    _inherit = 'supplier.price.request.line'
+
+    response_line_ids = fields.One2many('supplier.price.response.line', 'request_line_id', string='Offers')
+    current_unit_rate_p_per_kwh = fields.Float(string='Current Unit Rate (p/kWh)')
+    current_standing_gbp_per_day = fields.Float(string='Current Standing (£/day)')
+    current_annual_cost = fields.Float(string='Current Annual Cost', compute='_compute_current_annual_cost', store=True)
+
+    @api.depends('current_unit_rate_p_per_kwh', 'current_standing_gbp_per_day', 'annual_usage_kwh')
+    def _compute_current_annual_cost(self):
+        for rec in self:
+            if not rec.current_unit_rate_p_per_kwh and not rec.current_standing_gbp_per_day:
+                rec.current_annual_cost = 0.0
+                continue
+            rec.current_annual_cost = (rec.current_unit_rate_p_per_kwh / 100.0) * (rec.annual_usage_kwh or 0.0) \
+                + (rec.current_standing_gbp_per_day or 0.0) * 365
+
+
+class SupplierPriceResponse(models.Model):
+    _inherit = 'supplier.price.response'
+
+    total_annual_cost_with_uplift = fields.Monetary(
+        string='Total w/ Uplift', compute='_compute_total_with_uplift', currency_field='currency_id', store=True,
+        groups='energy_broker_uk.group_energy_broker_manager')
+    meters_quoted = fields.Integer(compute='_compute_meters_quoted', store=True)
+    rank = fields.Integer(compute='_compute_rank', store=True, index=True,
+                          help='Position among the request\'s responses by total annual cost, 1 being cheapest.')
+    rank_with_uplift = fields.Integer(string='Rank w/ Uplift', compute='_compute_rank', store=True,
+                                      groups='energy_broker_uk.group_energy_broker_manager')
+    is_best_offer = fields.Boolean(string='Best Offer', compute='_compute_rank', store=True)
+    savings_vs_current = fields.Monetary(
+        string='Savings vs Current', compute='_compute_savings', currency_field='currency_id', store=True,
+        help='Current annual cost of the quoted meters minus this offer\'s total; zero when current rates are unknown.')
+
+    @api.depends('line_ids.annual_cost_with_uplift')
+    def _compute_total_with_uplift(self):
+        for rec in self.sudo():
+            rec.total_annual_cost_with_uplift = sum(rec.line_ids.mapped('annual_cost_with_uplift'))
+
+    @api.depends('line_ids.request_line_id')
+    def _compute_meters_quoted(self):
+        for rec in self:
+            rec.meters_quoted = len(rec.line_ids.request_line_id)
+
+    @api.depends('request_id.response_ids.total_annual_cost', 'request_id.response_ids.meters_quoted',
+                 'request_id.response_ids.total_annual_cost_with_uplift')
+    def _compute_rank(self):
+        for request, recs in self.sudo().grouped('request_id').items():
+            rows = {
+                r.id: (r.meters_quoted, r.total_annual_cost, r.total_annual_cost_with_uplift)
+                for r in request.response_ids if r.id
+            }
+            ranks, uplift_ranks = rank_responses(rows)
+            for rec in recs:
+                rec.rank = ranks.get(rec.id, 0)
+                rec.rank_with_uplift = uplift_ranks.get(rec.id, 0)
+                rec.is_best_offer = rec.rank == 1
+
+    @api.depends('total_annual_cost', 'line_ids.request_line_id.current_annual_cost')
+    def _compute_savings(self):
+        for rec in self:
+            current = sum(rec.line_ids.request_line_id.mapped('current_annual_cost'))
+            rec.savings_vs_current = current - rec.total_annual_cost if current else 0.0
+
+
+class SupplierPriceResponseLine(models.Model):
+    _inherit = 'supplier.price.response.line'
+
+    rank = fields.Integer(compute='_compute_rank', store=True,
+                          help='Position among all offers for the same meter and term, 1 being cheapest.')
+    is_best_line = fields.Boolean(string='Best for Meter', compute='_compute_rank', store=True)
+
+    @api.depends('request_line_id.response_line_ids.annual_cost',
+                 'request_line_id.response_line_ids.contract_term_years')
+    def _compute_rank(self):
+        for request_line, recs in self.grouped('request_line_id').items():
+            ranks = {}
+            siblings = request_line.response_line_ids.filtered('id')
+            for term_lines in siblings.grouped('contract_term_years').values():
+                ranks.update(dense_rank({l.id: l.annual_cost for l in term_lines}))
+            for rec in recs:
+                rec.rank = ranks.get(rec.id, 0)
+                rec.is_best_line = rec.rank == 1
+
+
+class ReportSupplierPriceRequest(models.AbstractModel):
+    _name = 'report.energy_broker_uk.report_supplier_price_request'
+    _description = 'Supplier Price Comparison Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['supplier.price.request'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': 'supplier.price.request',
+            'docs': docs,
+            'comparison': docs._get_offer_comparison(),
+            'is_manager': self.env.user.has_group('energy_broker_uk.group_energy_broker_manager'),
+        }
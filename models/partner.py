@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields
+from odoo import models, fields, api
+
+from .supplier_adapters import adapter_selection
 
 
 class ResPartner(models.Model):
@@ -9,6 +11,14 @@ class ResPartner(models.Model):
     tender_email = fields.Char(string='Tender Email')
     default_uplift_p_per_kwh = fields.Float(string='Default Uplift (p/kWh)')
     is_commission_customer = fields.Boolean(string='Commission Customer', help='Suppliers pay us commission; mark as customer for invoicing purposes.')
+    pricing_adapter = fields.Selection(selection='_selection_pricing_adapter', string='Pricing API',
+                                       help='Adapter used to request prices from this supplier over its API.')
+    pricing_api_base_url = fields.Char(string='Pricing API URL', help='Falls back to the adapter default from settings when empty.')
+    pricing_api_key = fields.Char(string='Pricing API Key', groups='base.group_system')
+
+    @api.model
+    def _selection_pricing_adapter(self):
+        return adapter_selection()
 
     def action_mark_energy_supplier(self):
         for rec in self:
@@ -0,0 +1,118 @@
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_logger = logging.getLogger(__name__)
+
+PRICING_TIMEOUT = 30
+PRICING_MAX_WORKERS = 16
+PRICING_RETRIES = 3
+PRICING_BACKOFF = 0.5
+# Statuses meaning the supplier refused the request unprocessed, so a POST may be re-sent.
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
+
+class PricingRetry(Retry):
+    """urllib3 Retry that also retries non-idempotent requests on UNPROCESSED_STATUSES.
+
+    Other statuses and read errors are retried for idempotent methods only;
+    Retry-After is honoured when backing off.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code in UNPROCESSED_STATUSES and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class PricingResult:
+    __slots__ = ('ok', 'status', 'text', 'error', 'latency')
+
+    def __init__(self, ok, status=None, text=None, error=None, latency=0.0):
+        self.ok = ok
+        self.status = status
+        self.text = text
+        self.error = error
+        self.latency = latency
+
+
+class PricingClient:
+    """Pooled HTTP client for a supplier pricing API.
+
+    One ``requests.Session`` with a connection pool sized to the worker
+    count and urllib3 retries with exponential backoff: connection errors
+    and 429/503 for every method, other 5xx and read errors for idempotent
+    methods only.
+    ``post_many`` fans requests out on a thread pool; it never touches the
+    ORM, so callers build payloads and persist results in the calling
+    thread.
+    """
+
+    def __init__(self, base_url, api_key=None, max_workers=PRICING_MAX_WORKERS,
+                 timeout=PRICING_TIMEOUT, retries=PRICING_RETRIES, backoff=PRICING_BACKOFF):
+        self.base_url = (base_url or '').rstrip('/')
+        self.timeout = timeout
+        self.max_workers = max_workers
+        # quote requests are POSTs that are not idempotent: a supplier may have
+        # accepted one that then timed out, so they are retried only when the
+        # request never left (connect errors) or was refused unprocessed
+        retry = PricingRetry(
+            total=retries,
+            connect=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_key:
+            self.session.headers['Authorization'] = f'Bearer {api_key}'
+
+    def post(self, path, payload):
+        started = time.perf_counter()
+        try:
+            resp = self.session.post(self.base_url + path, data=json.dumps(payload), timeout=self.timeout)
+        except requests.RequestException as e:
+            return PricingResult(False, error=str(e), latency=time.perf_counter() - started)
+        latency = time.perf_counter() - started
+        if not resp.ok:
+            return PricingResult(False, resp.status_code, resp.text, f'HTTP {resp.status_code}', latency)
+        return PricingResult(True, resp.status_code, resp.text, latency=latency)
+
+    def post_many(self, path, payloads):
+        """POST every ``{key: payload}`` concurrently and return ``{key: PricingResult}``."""
+        return fan_out({key: (self, path, payload) for key, payload in payloads.items()}, self.max_workers)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fan_out(jobs, max_workers=PRICING_MAX_WORKERS):
+    """Run ``{key: (client, path, payload)}`` POSTs concurrently, possibly across clients.
+
+    Returns ``{key: PricingResult}``.
+    """
+    if not jobs:
+        return {}
+    workers = min(max_workers, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pricing') as pool:
+        futures = {key: pool.submit(client.post, path, payload) for key, (client, path, payload) in jobs.items()}
+        results = {key: future.result() for key, future in futures.items()}
+    _logger.info('Pricing fan-out: %s requests, %s failed', len(results), sum(1 for r in results.values() if not r.ok))
+    return results
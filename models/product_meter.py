@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from odoo import models, fields, api
 
+# Fields whose change can put a meter's type or identifiers out of sync.
+METER_SYNC_FIELDS = frozenset({'is_energy_meter', 'type', 'mpan_mprn', 'default_code'})
+
 
 class ProductProduct(models.Model):
     _inherit = 'product.product'
@@ -54,40 +57,53 @@ class ProductProduct(models.Model):
         return super().create(vals_list)
 
     def write(self, vals):
+        if vals.get('is_energy_meter') and 'type' in self._fields:
+            vals = dict(vals, type='service')
         res = super().write(vals)
-        for rec in self:
-            if rec.is_energy_meter:
-                if 'type' in rec._fields and rec.type != 'service':
-                    rec.type = 'service'
-                if 'default_code' in rec._fields:
-                    if rec.mpan_mprn and not rec.default_code:
-                        rec.default_code = rec.mpan_mprn
-                    elif rec.default_code and not rec.mpan_mprn:
-                        rec.mpan_mprn = rec.default_code
+        if METER_SYNC_FIELDS.isdisjoint(vals):
+            return res
+        meters = self.filtered('is_energy_meter')
+        # each fix-up costs a constant number of statements however many meters
+        # are written: the type is set with one batched write that bypasses this
+        # override, identifiers are copied across in SQL
+        if 'type' in self._fields:
+            not_service = meters.filtered(lambda r: r.type != 'service')
+            if not_service:
+                super(ProductProduct, not_service).write({'type': 'service'})
+        if 'default_code' in self._fields and meters:
+            meters._sync_meter_identifiers()
         return res
 
-    @api.onchange('default_code')
-    def _onchange_default_code_sync_mpan_tmpl(self):
+    def _sync_meter_identifiers(self):
+        """Copy mpan_mprn into an empty default_code and vice versa, one UPDATE each way.
+
+        The UPDATE bypasses ``write``, so it does what the ORM would have done
+        itself: stamp the write metadata, drop the stale cache, queue dependent
+        stored fields (``meter_key``, the template's ``default_code``) for
+        recomputation and run the constraints on the copied field.
+        """
+        self.flush_recordset(['mpan_mprn', 'default_code'])
+        for target, source in (('default_code', 'mpan_mprn'), ('mpan_mprn', 'default_code')):
+            # column names come from the fixed pairs above, never from input
+            self.env.cr.execute(f"""
+                UPDATE product_product
+                   SET {target} = {source}, write_uid = %s, write_date = %s
+                 WHERE id = ANY(%s)
+                   AND COALESCE({target}, '') = '' AND COALESCE({source}, '') != ''
+             RETURNING id
+            """, (self.env.uid, fields.Datetime.now(), self.ids))
+            synced = self.browse([row[0] for row in self.env.cr.fetchall()])
+            if synced:
+                synced.invalidate_recordset([target, 'meter_key', 'write_uid', 'write_date'])
+                synced.modified([target])
+                synced._validate_fields([target])
+
+    @api.onchange('default_code', 'mpan_mprn')
+    def _onchange_sync_meter_identifiers(self):
         for rec in self:
             if rec.default_code and not rec.mpan_mprn:
                 rec.mpan_mprn = rec.default_code
-
-    @api.onchange('mpan_mprn')
-    def _onchange_mpan_sync_default_code_tmpl(self):
-        for rec in self:
-            if rec.mpan_mprn and not rec.default_code:
-                rec.default_code = rec.mpan_mprn
-
-    @api.onchange('default_code')
-    def _onchange_default_code_sync_mpan(self):
-        for rec in self:
-            if rec.default_code and not rec.mpan_mprn:
-                rec.mpan_mprn = rec.default_code
-
-    @api.onchange('mpan_mprn')
-    def _onchange_mpan_sync_default_code(self):
-        for rec in self:
-            if rec.mpan_mprn and not rec.default_code:
+            elif rec.mpan_mprn and not rec.default_code:
                 rec.default_code = rec.mpan_mprn
 
 
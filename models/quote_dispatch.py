@@ -0,0 +1,134 @@
+import base64
+import hashlib
+import json
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError, ValidationError
+
+from .batching import iter_cron_batches
+
+QUOTE_REPORT = 'energy_broker_uk.report_supplier_price_request'
+# Requests rendered per wkhtmltopdf run; each batch is committed on its own.
+QUOTE_RENDER_BATCH = 25
+
+
+class SupplierPriceRequest(models.Model):
+    _inherit = 'supplier.price.request'
+
+    quote_state = fields.Selection([
+        ('none', 'Not Sent'),
+        ('queued', 'Queued'),
+        ('sent', 'Sent to Mail Queue'),
+        ('error', 'Failed'),
+    ], string='Customer Quote', default='none', copy=False, readonly=True, index=True)
+    quote_error = fields.Char(string='Quote Error', copy=False, readonly=True)
+    quote_attachment_id = fields.Many2one('ir.attachment', string='Quote PDF', copy=False, readonly=True)
+    quote_hash = fields.Char(copy=False, readonly=True,
+                             help='Fingerprint of the data the cached quote PDF was rendered from.')
+
+    def action_send_customer_quote(self):
+        """Queue the comparison quote for the customer; the quote cron renders and mails it."""
+        missing = self.filtered(lambda r: not r.partner_id.email)
+        if missing:
+            raise ValidationError(_('Customer email is required to send quotation: %s') % ', '.join(missing.mapped('name')))
+        self.write({'quote_state': 'queued', 'quote_error': False})
+        self.env.ref('energy_broker_uk.ir_cron_dispatch_quotes')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _('%s quotation(s) queued for sending.') % len(self),
+            },
+        }
+
+    def cron_dispatch_quotes(self):
+        queued = self.search([('quote_state', '=', 'queued')])
+        for batch in iter_cron_batches(queued, QUOTE_RENDER_BATCH):
+            batch._dispatch_quotes()
+
+    def _get_quote_hashes(self):
+        """Return ``{request_id: fingerprint}`` of everything the comparison report shows.
+
+        Built from the request fields the report prints, the customer and
+        LOA, and the count and latest write date of the request's lines,
+        responses and response lines, so adding, editing or removing any of
+        them changes the fingerprint. The request's own write date is left
+        out: queueing and dispatching bump it without changing the report.
+        """
+        disclaimer = self.env['ir.config_parameter'].sudo().get_param('energy_broker_uk.comparison_disclaimer')
+        parts = {
+            rec.id: [rec.name, rec.partner_id.id, rec.partner_id.write_date,
+                     rec.loa_id.id, rec.loa_id.write_date, disclaimer]
+            for rec in self
+        }
+        for model in ('supplier.price.request.line', 'supplier.price.response'):
+            for request, count, last in self.env[model]._read_group(
+                    [('request_id', 'in', self.ids)], ['request_id'], ['__count', 'write_date:max']):
+                parts[request.id] += [model, count, last]
+        responses = self.env['supplier.price.response'].search_read(
+            [('request_id', 'in', self.ids)], ['request_id'], load=None)
+        response_requests = {r['id']: r['request_id'] for r in responses}
+        for response, count, last in self.env['supplier.price.response.line']._read_group(
+                [('response_id', 'in', list(response_requests))], ['response_id'], ['__count', 'write_date:max']):
+            parts[response_requests[response.id]] += [response.id, count, last]
+        return {
+            request_id: hashlib.sha256(json.dumps(values, default=str).encode()).hexdigest()
+            for request_id, values in parts.items()
+        }
+
+    def _render_quotes(self):
+        """Render the comparison PDF for all of ``self`` in one wkhtmltopdf run; return ``{request_id: bytes}``."""
+        Report = self.env['ir.actions.report']
+        streams = Report._render_qweb_pdf_prepare_streams(QUOTE_REPORT, {}, res_ids=self.ids)
+        pdfs = {}
+        for rec in self:
+            stream = streams.get(rec.id, {}).get('stream')
+            if stream is None:
+                # the merged PDF could not be split per record
+                pdfs[rec.id] = Report._render_qweb_pdf(QUOTE_REPORT, [rec.id])[0]
+            else:
+                pdfs[rec.id] = stream.getvalue()
+        return pdfs
+
+    def _dispatch_quotes(self):
+        hashes = self._get_quote_hashes()
+        stale = self.filtered(lambda r: not r.quote_attachment_id or r.quote_hash != hashes[r.id])
+        if stale:
+            try:
+                pdfs = stale._render_quotes()
+            except UserError as e:
+                stale.write({'quote_state': 'error', 'quote_error': str(e)})
+                return
+            # re-rendered quotes overwrite their attachment rather than piling up
+            # new ones; mails that already carry it keep a valid link
+            for rec in stale.filtered('quote_attachment_id'):
+                rec.quote_attachment_id.sudo().write({
+                    'name': f"{rec.name}_comparison.pdf",
+                    'datas': base64.b64encode(pdfs[rec.id]),
+                })
+            missing = stale.filtered(lambda r: not r.quote_attachment_id)
+            attachments = self.env['ir.attachment'].create([{
+                'name': f"{rec.name}_comparison.pdf",
+                'type': 'binary',
+                'datas': base64.b64encode(pdfs[rec.id]),
+                'res_model': rec._name,
+                'res_id': rec.id,
+                'mimetype': 'application/pdf',
+            } for rec in missing])
+            created = dict(zip(missing.ids, attachments.ids))
+            for rec in stale:
+                rec.write({
+                    'quote_attachment_id': created.get(rec.id, rec.quote_attachment_id.id),
+                    'quote_hash': hashes[rec.id],
+                })
+        # queued, not sent inline: the mail queue cron delivers them
+        self.env['mail.mail'].create([{
+            'subject': _('Energy Pricing Comparison: %s') % (rec.name,),
+            'body_html': _('<p>Please find attached your energy pricing comparison.</p>'),
+            'email_to': rec.partner_id.email,
+            'model': rec._name,
+            'res_id': rec.id,
+            'attachment_ids': [(4, rec.quote_attachment_id.id)],
+        } for rec in self])
+        self.write({'quote_state': 'sent', 'quote_error': False})
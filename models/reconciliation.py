@@ -1,19 +1,39 @@
 from odoo import models, fields
 
+
 class SupplierReconciliationLine(models.Model):
-    _name = supplier.reconciliation.line
-    _description = Supplier Commission Reconciliation Line
+    _name = 'supplier.reconciliation.line'
+    _description = 'Supplier Commission Reconciliation Line'
+    _order = 'date desc, id desc'
 
-    contract_id = fields.Many2one(customer.contract, required=True, ondelete=cascade)
-    date = fields.Date(default=fields.Date.context_today)
-    com_amount = fields.Float(string=Supplier Commission Amount)
+    contract_id = fields.Many2one('customer.contract', required=True, index=True, ondelete='cascade')
+    date = fields.Date(default=fields.Date.context_today, required=True)
+    com_amount = fields.Float(string='Supplier Commission Amount')
     note = fields.Char()
+    mpan_mprn = fields.Char(string='MPAN/MPRN')
+    statement_ref = fields.Char(string='Statement', index='btree_not_null')
+    expected_amount = fields.Float(help='Commission the ledger expected from the contract over the statement period.')
+    variance_state = fields.Selection([
+        ('ok', 'Matches'),
+        ('under', 'Underpaid'),
+        ('over', 'Overpaid'),
+        ('unexpected', 'Not Expected'),
+    ], string='Variance', index='btree_not_null')
+    import_key = fields.Char(copy=False, readonly=True,
+                             help='Fingerprint of the statement row this line was imported from.')
+
+    _import_key_unique = models.UniqueIndex(
+        '(import_key) WHERE import_key IS NOT NULL',
+        'This statement row has already been imported.',
+    )
+
 
 class BrokerReconciliationLine(models.Model):
-    _name = broker.reconciliation.line
-    _description = Broker Commission Reconciliation Line
+    _name = 'broker.reconciliation.line'
+    _description = 'Broker Commission Reconciliation Line'
+    _order = 'date desc, id desc'
 
-    contract_id = fields.Many2one(customer.contract, required=True, ondelete=cascade)
-    date = fields.Date(default=fields.Date.context_today)
-    comm_amount = fields.Float(string=Broker Commission Amount)
+    contract_id = fields.Many2one('customer.contract', required=True, index=True, ondelete='cascade')
+    date = fields.Date(default=fields.Date.context_today, required=True)
+    comm_amount = fields.Float(string='Broker Commission Amount')
     note = fields.Char()
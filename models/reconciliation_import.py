@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+import base64
+import hashlib
+import json
+import time
+from collections import defaultdict
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api, _
+
+from .hh_import import MAX_REPORTED_ERRORS, parse_date
+from .meter_ids import normalise_identifier
+from .meter_import import iter_sheet_rows
+
+# Reconciliation lines created per batched create() call.
+RECONCILE_CREATE_BATCH = 1000
+
+STATEMENT_COLUMN_ALIASES = {
+    'mpan_mprn': ('mpan_mprn', 'mpan', 'mprn', 'mpan core', 'meter'),
+    'reference': ('reference', 'contract', 'contract ref', 'contract reference', 'broker ref', 'broker reference'),
+    'date': ('date', 'payment date', 'period', 'period end', 'statement date'),
+    'amount': ('amount', 'commission', 'commission amount', 'value', 'paid'),
+    'note': ('note', 'notes', 'description', 'comment'),
+}
+
+
+def _parse_amount(value):
+    """Parse a statement amount such as ``1,234.50``, ``£12`` or ``(3.20)``."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace('£', '').replace(',', '').replace(' ', '')
+    negative = text.startswith('(') and text.endswith(')')
+    try:
+        amount = float(text.strip('()'))
+    except ValueError:
+        raise ValueError(_('Invalid amount %r') % value)
+    return -amount if negative else amount
+
+
+def _row_key(supplier_id, contract_id, on_date, amount, identifier, reference, occurrence):
+    """Fingerprint of a matched statement row; ``occurrence`` tells identical rows of one statement apart."""
+    payload = json.dumps([supplier_id, contract_id, str(on_date), round(amount, 2), identifier or '', reference or '', occurrence])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _pick_contract(candidates, on_date):
+    """Return the candidate ``(id, start, end)`` running on ``on_date``, or the only candidate."""
+    candidates = list(candidates)
+    running = [c for c in candidates if c[1] <= on_date <= c[2]]
+    if len(running) == 1:
+        return running[0][0]
+    if len(candidates) == 1:
+        return candidates[0][0]
+    return None
+
+
+class EnergyReconciliationImport(models.TransientModel):
+    _name = 'energy.reconciliation.import'
+    _description = 'Import Supplier Commission Statement'
+
+    data_file = fields.Binary(string='File', required=True)
+    filename = fields.Char()
+    file_format = fields.Selection([('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', required=True)
+    supplier_id = fields.Many2one('res.partner', string='Supplier', domain=[('supplier_rank', '>', 0)], required=True)
+    period_start = fields.Date(required=True, default=lambda self: fields.Date.context_today(self).replace(day=1))
+    period_end = fields.Date(required=True, default=lambda self: fields.Date.context_today(self).replace(day=1)
+                             + relativedelta(months=1, days=-1))
+    tolerance = fields.Float(string='Variance Tolerance', default=1.0,
+                             help='Differences between received and expected commission up to this amount are not flagged.')
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    rows_read = fields.Integer(readonly=True)
+    rows_rejected = fields.Integer(readonly=True)
+    rows_skipped = fields.Integer(string='Already Imported', readonly=True)
+    lines_created = fields.Integer(readonly=True)
+    contracts_matched = fields.Integer(readonly=True)
+    contracts_flagged = fields.Integer(string='Contracts with Variance', readonly=True)
+    duration_seconds = fields.Float(string='Duration (s)', readonly=True)
+    error_report = fields.Text(readonly=True)
+    variance_report = fields.Text(readonly=True)
+
+    @api.onchange('filename')
+    def _onchange_filename(self):
+        for rec in self:
+            if rec.filename and rec.filename.lower().endswith('.xlsx'):
+                rec.file_format = 'xlsx'
+
+    def action_import(self):
+        self.ensure_one()
+        started = time.perf_counter()
+        rows = iter_sheet_rows(base64.b64decode(self.data_file or b''), self.file_format,
+                               aliases=STATEMENT_COLUMN_ALIASES, required=('amount',))
+        stats = self._import_rows(rows)
+        self.write({
+            'state': 'done',
+            'rows_read': stats['read'],
+            'rows_rejected': stats['rejected'],
+            'rows_skipped': stats['skipped'],
+            'lines_created': stats['lines_created'],
+            'contracts_matched': stats['contracts_matched'],
+            'contracts_flagged': len(stats['variances']),
+            'duration_seconds': time.perf_counter() - started,
+            'error_report': '\n'.join(stats['errors']),
+            'variance_report': '\n'.join(stats['variances'][:MAX_REPORTED_ERRORS]),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_open_lines(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Statement Lines'),
+            'res_model': 'supplier.reconciliation.line',
+            'view_mode': 'list',
+            'domain': [('statement_ref', '=', self._statement_ref())],
+        }
+
+    def _statement_ref(self):
+        return '%s %s' % (self.supplier_id.display_name, self.filename or self.period_start)
+
+    def _get_contract_indexes(self):
+        """Return ``(by_meter, by_reference)`` dicts of ``key -> {(contract_id, start, end)}``.
+
+        Both are built from two search_read calls over the supplier's
+        contracts, so each statement row is matched with dict lookups only.
+        """
+        by_meter, by_reference = defaultdict(set), defaultdict(set)
+        contracts = self.env['customer.contract'].search_read(
+            [('supplier_id', '=', self.supplier_id.id)],
+            ['name', 'price_request_id', 'start_date', 'end_date'], load=None)
+        by_request = defaultdict(list)
+        for row in contracts:
+            entry = (row['id'], row['start_date'], row['end_date'])
+            if row['name']:
+                by_reference[row['name'].strip().upper()].add(entry)
+            if row['price_request_id']:
+                by_request[row['price_request_id']].append(entry)
+        if by_request:
+            for line in self.env['supplier.price.request.line'].search_read(
+                    [('request_id', 'in', list(by_request)), ('meter_key', '!=', False)],
+                    ['request_id', 'meter_key'], load=None):
+                by_meter[line['meter_key']].update(by_request[line['request_id']])
+        return by_meter, by_reference
+
+    def _import_rows(self, rows):
+        """Match statement rows to contracts, then bulk-create lines flagged against the ledger.
+
+        Rows that match no contract (or more than one) are reported and
+        skipped; they never abort the import. Rows already imported, from
+        this or an overlapping statement, are recognised by their import
+        key and skipped, so re-importing a statement creates no duplicates.
+        """
+        stats = {'read': 0, 'rejected': 0, 'skipped': 0, 'errors': [], 'lines_created': 0,
+                 'contracts_matched': 0, 'variances': []}
+
+        def reject(line_no, message):
+            stats['rejected'] += 1
+            if len(stats['errors']) < MAX_REPORTED_ERRORS:
+                stats['errors'].append(_('Line %(line)s: %(error)s', line=line_no, error=message))
+
+        by_meter, by_reference = self._get_contract_indexes()
+        default_date = self.period_end
+        matched, occurrences = [], defaultdict(int)
+        for line_no, values in rows:
+            stats['read'] += 1
+            try:
+                amount = _parse_amount(values.get('amount', ''))
+                on_date = values.get('date') or default_date
+                if isinstance(on_date, datetime):
+                    on_date = on_date.date()
+                elif not isinstance(on_date, date):
+                    on_date = parse_date(str(on_date))
+            except ValueError as e:
+                reject(line_no, str(e))
+                continue
+            identifier = normalise_identifier(values.get('mpan_mprn'))
+            reference = str(values.get('reference') or '').strip().upper()
+            if not identifier and not reference:
+                reject(line_no, _('No MPAN/MPRN or contract reference'))
+                continue
+            contract_id = None
+            if reference in by_reference:
+                contract_id = _pick_contract(by_reference[reference], on_date)
+            if not contract_id and identifier in by_meter:
+                contract_id = _pick_contract(by_meter[identifier], on_date)
+            if not contract_id:
+                known = reference in by_reference or identifier in by_meter
+                reject(line_no, (_('Several contracts match %s') if known else _('No contract found for %s'))
+                       % (reference or identifier))
+                continue
+            occurrence_key = (contract_id, on_date, amount, identifier, reference)
+            occurrences[occurrence_key] += 1
+            key = _row_key(self.supplier_id.id, *occurrence_key, occurrences[occurrence_key])
+            matched.append((contract_id, on_date, amount, identifier, values.get('note'), key))
+
+        imported = self._get_imported_keys([row[-1] for row in matched])
+        stats['skipped'] = sum(1 for row in matched if row[-1] in imported)
+        matched = [row for row in matched if row[-1] not in imported]
+        received = defaultdict(float)
+        for contract_id, __, amount, __, __, __ in matched:
+            received[contract_id] += amount
+        stats['contracts_matched'] = len(received)
+        expected, flags = self._get_expected_commission(list(received)), {}
+        contract_names = {c.id: c.name for c in self.env['customer.contract'].browse(received)}
+        for contract_id, total in received.items():
+            expectation = expected.get(contract_id)
+            if expectation is None:
+                flags[contract_id] = 'unexpected'
+            elif abs(total - expectation) <= self.tolerance:
+                flags[contract_id] = 'ok'
+            else:
+                flags[contract_id] = 'under' if total < expectation else 'over'
+            if flags[contract_id] != 'ok':
+                stats['variances'].append(_('%(contract)s: received %(received).2f, expected %(expected).2f',
+                                            contract=contract_names[contract_id], received=total,
+                                            expected=expectation or 0.0))
+
+        Line = self.env['supplier.reconciliation.line']
+        statement_ref = self._statement_ref()
+        for start in range(0, len(matched), RECONCILE_CREATE_BATCH):
+            batch = matched[start:start + RECONCILE_CREATE_BATCH]
+            Line.create([{
+                'contract_id': contract_id,
+                'date': on_date,
+                'com_amount': amount,
+                'mpan_mprn': identifier or False,
+                'note': note or False,
+                'statement_ref': statement_ref,
+                'expected_amount': expected.get(contract_id, 0.0),
+                'variance_state': flags[contract_id],
+                'import_key': key,
+            } for contract_id, on_date, amount, identifier, note, key in batch])
+            stats['lines_created'] += len(batch)
+        return stats
+
+    def _get_imported_keys(self, keys):
+        """Return the subset of ``keys`` already stored on reconciliation lines, in one query."""
+        if not keys:
+            return set()
+        self.env['supplier.reconciliation.line'].flush_model(['import_key'])
+        self.env.cr.execute("""
+            SELECT import_key FROM supplier_reconciliation_line WHERE import_key = ANY(%s)
+        """, (keys,))
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _get_expected_commission(self, contract_ids):
+        """Return ``{contract_id: amount}`` still expected over the statement period.
+
+        Ledger instalments accrued in the period, less anything already
+        received for it before this statement, read in one grouped query.
+        Contracts with an expectation already met map to 0.0, so only
+        contracts expecting nothing in the period are missing.
+        """
+        contracts = self.env['customer.contract'].browse(contract_ids)
+        contracts.filtered('commission_dirty')._rebuild_commission_ledger()
+        groups = self.env['energy.commission.entry']._read_group(
+            [('contract_id', 'in', contract_ids), ('entry_type', 'in', ('expected', 'received')),
+             ('date', '>=', self.period_start), ('date', '<=', self.period_end)],
+            ['contract_id'], ['expected_amount:sum', 'variance:sum'])
+        # variance is received minus expected, so its negation is what is still owed
+        return {contract.id: max(-variance, 0.0) for contract, expected, variance in groups if expected}
@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools import split_every
+
+from .batching import iter_cron_batches
+
+# Days ahead of today the pipeline looks for contract and site end dates.
+RENEWAL_HORIZON_DAYS = 180
+# Default lead time at which draft LOAs and tenders are raised (energy_broker_uk.renewal_tender_days).
+RENEWAL_TENDER_DAYS = 120
+RENEWAL_CREATE_BATCH = 1000
+# Contract states that are never renewed.
+RENEWAL_SKIPPED_STATES = ('cancelled', 'cot_cancelled')
+# (code, label, first day, last day) relative to today, inclusive.
+RENEWAL_WINDOWS = [
+    ('overdue', 'Overdue', None, -1),
+    ('30', '0-30 days', 0, 30),
+    ('60', '31-60 days', 31, 60),
+    ('90', '61-90 days', 61, 90),
+    ('120', '91-120 days', 91, 120),
+    ('180', '121-180 days', 121, RENEWAL_HORIZON_DAYS),
+]
+
+
+def renewal_window(days_left):
+    for code, label, first, last in RENEWAL_WINDOWS:
+        if (first is None or days_left >= first) and days_left <= last:
+            return code
+    return False
+
+
+class EnergyRenewal(models.Model):
+    """One upcoming renewal of a contract or of a site's current supply."""
+    _name = 'energy.renewal'
+    _description = 'Renewal Pipeline Entry'
+    _order = 'end_date, id'
+
+    partner_id = fields.Many2one('res.partner', string='Customer', required=True, index=True)
+    contract_id = fields.Many2one('customer.contract', ondelete='cascade', index='btree_not_null')
+    site_id = fields.Many2one('customer.site', ondelete='cascade', index='btree_not_null')
+    end_date = fields.Date(required=True, index=True)
+    window = fields.Selection([(code, label) for code, label, first, last in RENEWAL_WINDOWS], index=True)
+    loa_id = fields.Many2one('customer.loa', string='Renewal LOA')
+    request_id = fields.Many2one('supplier.price.request', string='Renewal Tender')
+    stage = fields.Selection([
+        ('upcoming', 'Upcoming'),
+        ('tendering', 'Tendering'),
+        ('priced', 'Priced'),
+        ('renewed', 'Renewed'),
+        ('lost', 'Lost'),
+    ], compute='_compute_stage', store=True, index=True)
+    lost = fields.Boolean()
+
+    _contract_end_unique = models.UniqueIndex(
+        '(contract_id, end_date) WHERE contract_id IS NOT NULL',
+        'A contract can only be in the pipeline once per end date.',
+    )
+    _site_end_unique = models.UniqueIndex(
+        '(site_id, end_date) WHERE site_id IS NOT NULL',
+        'A site can only be in the pipeline once per end date.',
+    )
+
+    @api.depends('lost', 'request_id', 'request_id.response_ids', 'request_id.contract_id')
+    def _compute_stage(self):
+        for rec in self:
+            if rec.lost:
+                rec.stage = 'lost'
+            elif rec.request_id.contract_id:
+                rec.stage = 'renewed'
+            elif rec.request_id.response_ids:
+                rec.stage = 'priced'
+            elif rec.request_id:
+                rec.stage = 'tendering'
+            else:
+                rec.stage = 'upcoming'
+
+    @api.model
+    def _get_tender_days(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        return int(ICP.get_param('energy_broker_uk.renewal_tender_days') or RENEWAL_TENDER_DAYS)
+
+    @api.model
+    def cron_build_pipeline(self):
+        self._prune_stale()
+        self._build_pipeline()
+        self._refresh_windows()
+        self._raise_tenders()
+
+    @api.model
+    def _build_pipeline(self, today=None):
+        """Add every contract and site ending within the horizon that is not in the pipeline yet.
+
+        Two range queries over the book, one over the pipeline, then batched
+        creates; nothing depends on the cron having run on any given day.
+        """
+        today = today or fields.Date.context_today(self)
+        horizon = today + timedelta(days=RENEWAL_HORIZON_DAYS)
+        known_contracts = set()
+        known_sites = set()
+        for row in self.search_read([('end_date', '>=', today)], ['contract_id', 'site_id', 'end_date'], load=None):
+            if row['contract_id']:
+                known_contracts.add((row['contract_id'], row['end_date']))
+            if row['site_id']:
+                known_sites.add((row['site_id'], row['end_date']))
+        vals_list = []
+        for row in self.env['customer.contract'].search_read(
+                [('end_date', '>=', today), ('end_date', '<=', horizon), ('state', 'not in', RENEWAL_SKIPPED_STATES)],
+                ['partner_id', 'end_date'], load=None):
+            if (row['id'], row['end_date']) not in known_contracts:
+                vals_list.append({'contract_id': row['id'], 'partner_id': row['partner_id'], 'end_date': row['end_date']})
+        for row in self.env['customer.site'].search_read(
+                [('contract_end_date', '>=', today), ('contract_end_date', '<=', horizon)],
+                ['partner_id', 'contract_end_date'], load=None):
+            if (row['id'], row['contract_end_date']) not in known_sites:
+                vals_list.append({'site_id': row['id'], 'partner_id': row['partner_id'], 'end_date': row['contract_end_date']})
+        for vals in vals_list:
+            vals['window'] = renewal_window((vals['end_date'] - today).days)
+        for batch in split_every(RENEWAL_CREATE_BATCH, vals_list):
+            self.create(list(batch))
+        return len(vals_list)
+
+    def _current_end_date(self):
+        """End date the entry's contract or site renews on now, False if it no longer renews."""
+        self.ensure_one()
+        if self.contract_id:
+            return self.contract_id.state not in RENEWAL_SKIPPED_STATES and self.contract_id.end_date
+        return self.site_id.contract_end_date
+
+    @api.model
+    def _prune_stale(self):
+        """Reconcile open entries whose contract or site end date moved, or which stopped renewing.
+
+        Entries without a tender yet are removed (the pipeline build re-adds
+        the new end date); entries already tendering follow the new end date,
+        or are closed as lost when there is none or it already has an entry.
+        """
+        entries = self.search([('stage', 'not in', ('renewed', 'lost'))])
+        entries.fetch(['contract_id', 'site_id', 'end_date', 'request_id'])
+        current = {entry.id: entry._current_end_date() for entry in entries}
+        stale = entries.filtered(lambda e: current[e.id] != e.end_date)
+        if not stale:
+            return 0
+        known = {(e.contract_id.id, e.site_id.id, e.end_date) for e in entries - stale}
+        untendered = stale.filtered(lambda e: not e.request_id)
+        tendering = stale - untendered
+        movable = tendering.filtered(
+            lambda e: current[e.id] and (e.contract_id.id, e.site_id.id, current[e.id]) not in known)
+        (tendering - movable).write({'lost': True})
+        for end_date, recs in movable.grouped(lambda e: current[e.id]).items():
+            recs.write({'end_date': end_date})
+        untendered.unlink()
+        return len(stale)
+
+    @api.model
+    def _refresh_windows(self, today=None):
+        """Move open entries into today's window with one range-bounded write per window."""
+        today = today or fields.Date.context_today(self)
+        for code, label, first, last in RENEWAL_WINDOWS:
+            domain = [('stage', 'not in', ('renewed', 'lost')), ('window', '!=', code),
+                      ('end_date', '<=', today + timedelta(days=last))]
+            if first is not None:
+                domain.append(('end_date', '>=', today + timedelta(days=first)))
+            self.search(domain).write({'window': code})
+
+    @api.model
+    def _raise_tenders(self, today=None):
+        """Create one draft LOA and price request per customer for renewals within the tender lead time."""
+        today = today or fields.Date.context_today(self)
+        due = self.search([
+            ('stage', '=', 'upcoming'),
+            ('request_id', '=', False),
+            ('end_date', '>=', today),
+            ('end_date', '<=', today + timedelta(days=self._get_tender_days())),
+        ])
+        for batch in iter_cron_batches(due):
+            batch._create_tenders()
+
+    def _create_tenders(self):
+        by_partner = self.grouped('partner_id')
+        partners = list(by_partner)
+        loas = self.env['customer.loa'].create([{'partner_id': partner.id} for partner in partners])
+        # meters to re-tender: the lines of the contract's original tender, or the site itself
+        self.contract_id.price_request_id.line_ids.fetch(
+            ['meter_key', 'mpan_mprn', 'product_id', 'annual_usage_kwh', 'meter_type', 'supply_address'])
+        requests = self.env['supplier.price.request'].create([{
+            'loa_id': loa.id,
+            'line_ids': [(0, 0, vals) for vals in by_partner[partner]._renewal_line_vals()],
+        } for partner, loa in zip(partners, loas)])
+        for partner, loa, request in zip(partners, loas, requests):
+            by_partner[partner].write({'loa_id': loa.id, 'request_id': request.id})
+
+    def _renewal_line_vals(self):
+        vals_list, seen = [], set()
+        hh_usage = self.contract_id.price_request_id.line_ids.product_id._get_tender_usage()
+        site_usage = self.site_id._get_tender_usage()
+        for rec in self:
+            if rec.contract_id:
+                for line in rec.contract_id.price_request_id.line_ids:
+                    key = line.meter_key or line.id
+                    if key not in seen:
+                        seen.add(key)
+                        vals_list.append({
+                            'product_id': line.product_id.id,
+                            'mpan_mprn': line.mpan_mprn,
+                            'annual_usage_kwh': hh_usage.get(line.product_id.id) or line.annual_usage_kwh,
+                            'meter_type': line.meter_type,
+                            'supply_address': line.supply_address,
+                            'current_supplier_id': rec.contract_id.supplier_id.id,
+                            'contract_end_date': rec.end_date,
+                        })
+            elif rec.site_id:
+                site = rec.site_id
+                key = site.meter_key or ('site', site.id)
+                if key not in seen:
+                    seen.add(key)
+                    vals_list.append({
+                        'mpan_mprn': site.mpan_mprn,
+                        'annual_usage_kwh': site_usage.get(site.id) or site.annual_usage_kwh,
+                        'meter_type': site.meter_type if site.meter_type in ('hh', 'nhh') else False,
+                        'supply_address': ', '.join(filter(None, (site.street, site.city, site.zip))),
+                        'current_supplier_id': site.current_supplier_id.id,
+                        'contract_end_date': rec.end_date,
+                    })
+        return vals_list
+
+    def action_mark_lost(self):
+        self.write({'lost': True})
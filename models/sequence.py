@@ -0,0 +1,29 @@
+def reserve_sequence(env, code, count):
+    """Return ``count`` consecutive names from the ``ir.sequence`` with ``code``, reserved in one query.
+
+    Equivalent to calling ``next_by_code(code)`` ``count`` times. Sequences
+    with date ranges fall back to exactly that. Returns ``[]`` when no
+    sequence matches ``code``.
+    """
+    if count <= 0:
+        return []
+    IrSequence = env['ir.sequence'].sudo()
+    company_id = env.company.id
+    seq = IrSequence.search([('code', '=', code), ('company_id', 'in', [company_id, False])],
+                            order='company_id', limit=1)
+    if not seq:
+        return []
+    if seq.use_date_range:
+        return [seq.next_by_id() for _i in range(count)]
+    if seq.implementation == 'standard':
+        env.cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)", ('ir_sequence_%03d' % seq.id, count))
+        numbers = [row[0] for row in env.cr.fetchall()]
+    else:
+        env.cr.execute("SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT", (seq.id,))
+        env.cr.execute("""
+            UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s RETURNING number_next - %s
+        """, (seq.number_increment * count, seq.id, seq.number_increment * count))
+        start = env.cr.fetchone()[0]
+        numbers = [start + i * seq.number_increment for i in range(count)]
+        seq.invalidate_recordset(['number_next'])
+    return [seq.get_next_char(number) for number in numbers]
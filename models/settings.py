@@ -20,6 +20,12 @@ class ResConfigSettings(models.TransientModel):
 
     max_uplift_p_per_kwh = fields.Float(string='Max Uplift (p/kWh)', config_parameter='energy_broker_uk.max_uplift_p_per_kwh')
 
+    hh_storage_mode = fields.Selection([
+        ('rows', 'One row per interval'),
+        ('daily', 'Packed per meter per day'),
+    ], string='HH Read Storage', default='rows', config_parameter='energy_broker_uk.hh_storage_mode',
+        help='Changing this moves every stored read into the new storage when the settings are saved.')
+
     # Optional: Documents folder integration can be added after the Documents app is installed
 
     def get_values(self):
@@ -31,7 +37,16 @@ class ResConfigSettings(models.TransientModel):
         return res
 
     def set_values(self):
+        old_mode = self.env['energy.hh.read']._get_storage_mode()
         super().set_values()
+        # each mode reads only its own store, so existing reads follow the switch
+        new_mode = self.hh_storage_mode or 'rows'
+        if new_mode != old_mode:
+            HHDay = self.env['energy.hh.day'].sudo()
+            if new_mode == 'daily':
+                HHDay._pack_rows()
+            else:
+                HHDay._unpack_days()
         ICP = self.env['ir.config_parameter'].sudo()
         ids = self.tender_default_suppliers_ids.ids if self.tender_default_suppliers_ids else []
         ICP.set_param('energy_broker_uk.tender_default_suppliers_ids', ','.join(str(i) for i in ids))
@@ -0,0 +1,12 @@
+from odoo import models
+
+
+class SignRequest(models.Model):
+    _inherit = "sign.request"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "state" in vals:
+            contracts = self.env["customer.contract"].sudo().search([("sign_request_id", "in", self.ids)])
+            contracts._sync_sign_status()
+        return res
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
+from odoo import models, fields, api
+
+from .meter_ids import check_identifiers
 
 
 class CustomerSite(models.Model):
@@ -32,18 +33,4 @@ class CustomerSite(models.Model):
 
     @api.constrains('mpan_mprn', 'meter_type')
     def _check_mpan_mprn(self):
-        for rec in self:
-            if not rec.mpan_mprn:
-                continue
-            val = rec.mpan_mprn.replace(' ', '')
-            if rec.meter_type in ('hh', 'nhh'):
-                if not val.isdigit() or len(val) != 13:
-                    raise ValidationError(_('Electricity MPAN core must be 13 digits.'))
-                weights = [3, 7, 1] * 4
-                total = sum(int(d) * w for d, w in zip(val[:12], weights))
-                check = total % 10
-                if check != int(val[12]):
-                    raise ValidationError(_('Invalid MPAN check digit.'))
-            else:
-                if not val.isdigit() or not (6 <= len(val) <= 11):
-                    raise ValidationError(_('Gas MPRN must be 6 to 11 digits.'))
+        check_identifiers(self)
@@ -0,0 +1,125 @@
+import json
+
+from .json_stream import JsonItemStream
+from .meter_ids import normalise_identifier
+
+# Registered supplier pricing adapters by code, see register_adapter.
+SUPPLIER_ADAPTERS = {}
+
+
+def register_adapter(cls):
+    """Class decorator adding a SupplierAdapter subclass to the registry."""
+    SUPPLIER_ADAPTERS[cls.code] = cls
+    return cls
+
+
+def get_adapter(code):
+    cls = SUPPLIER_ADAPTERS.get(code)
+    return cls() if cls else None
+
+
+def adapter_selection():
+    return [(code, cls.label) for code, cls in SUPPLIER_ADAPTERS.items()]
+
+
+def _first(item, keys, default=None):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+class SupplierAdapter:
+    """Request builder and response parser for one supplier's pricing API.
+
+    ``build_payload`` runs in the ORM thread; ``parse_offers`` must be pure so
+    responses can be parsed without an environment. Offers are normalised to
+    dicts with ``identifier``, ``unit_rate_p_per_kwh``,
+    ``standing_charge_gbp_per_day``, ``contract_term_years`` and ``kva_price``.
+    """
+    code = None
+    label = None
+    quote_path = '/quotes'
+    # ir.config_parameter keys used when the supplier partner has no API settings
+    base_url_param = None
+    api_key_param = None
+
+    def credentials(self, partner):
+        ICP = partner.env['ir.config_parameter'].sudo()
+        base_url = partner.pricing_api_base_url or (self.base_url_param and ICP.get_param(self.base_url_param))
+        api_key = partner.sudo().pricing_api_key or (self.api_key_param and ICP.get_param(self.api_key_param))
+        return base_url, api_key
+
+    def build_payload(self, request):
+        return {
+            'customer': request.partner_id.display_name if request.partner_id else None,
+            'reference': request.name,
+            'meters': [{
+                'identifier': line.mpan_mprn,
+                'type': line.meter_type or '',
+                'annual_usage_kwh': line.annual_usage_kwh or 0.0,
+                'supply_address': line.supply_address or '',
+            } for line in request.line_ids],
+        }
+
+    def iter_items(self, data):
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            for key in ('offers', 'quotes', 'results'):
+                if isinstance(data.get(key), list):
+                    return data[key]
+        return []
+
+    def normalise(self, item):
+        raise NotImplementedError
+
+    def parse_offers(self, data):
+        return [self.normalise(item) for item in self.iter_items(data)]
+
+    def parse_response(self, text):
+        return self.parse_offers(json.loads(text))
+
+    def iter_offers(self, fileobj):
+        """Stream ``(offer, error)`` pairs from a JSON file object, one item in memory at a time."""
+        for item in JsonItemStream(fileobj):
+            try:
+                yield self.normalise(item), None
+            except (ValueError, TypeError, AttributeError) as e:
+                yield None, str(e)
+
+
+@register_adapter
+class JellyfishAdapter(SupplierAdapter):
+    code = 'jellyfish'
+    label = 'Jellyfish Energy'
+    quote_path = '/pricing/quotes'
+    base_url_param = 'energy_broker_uk.jellyfish_api_base_url'
+    api_key_param = 'energy_broker_uk.jellyfish_api_key'
+
+    def normalise(self, item):
+        term_months = item.get('term_months')
+        return {
+            'identifier': normalise_identifier(_first(item, ('identifier', 'mpan', 'mprn'))),
+            'unit_rate_p_per_kwh': float(_first(item, ('unit_rate_p_per_kwh', 'unit_rate_ppkwh', 'unit_rate'), 0.0)),
+            'standing_charge_gbp_per_day': float(_first(item, ('standing_charge_gbp_per_day', 'standing_charge_per_day', 'standing'), 0.0)),
+            'contract_term_years': int(item.get('term_years') or (term_months and int(term_months) // 12) or 1),
+            'kva_price': float(item.get('kva_price') or 0.0),
+        }
+
+
+@register_adapter
+class GenericJsonAdapter(SupplierAdapter):
+    """Suppliers exposing the broker's reference JSON schema field for field."""
+    code = 'generic_json'
+    label = 'Generic JSON'
+
+    def normalise(self, item):
+        return {
+            'identifier': normalise_identifier(item.get('identifier')),
+            'unit_rate_p_per_kwh': float(item.get('unit_rate_p_per_kwh') or 0.0),
+            'standing_charge_gbp_per_day': float(item.get('standing_charge_gbp_per_day') or 0.0),
+            'contract_term_years': int(item.get('contract_term_years') or 1),
+            'kva_price': float(item.get('kva_price') or 0.0),
+        }
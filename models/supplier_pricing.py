@@ -0,0 +1,17 @@
+from odoo import models, fields
+
+
+class SupplierPricingCall(models.Model):
+    """One supplier API call made for a price request, kept for latency and error reporting."""
+    _name = 'supplier.pricing.call'
+    _description = 'Supplier Pricing API Call'
+    _order = 'id desc'
+
+    request_id = fields.Many2one('supplier.price.request', required=True, index=True, ondelete='cascade')
+    partner_id = fields.Many2one('res.partner', string='Supplier', required=True, index=True, ondelete='cascade')
+    adapter = fields.Char()
+    ok = fields.Boolean(string='Succeeded')
+    status_code = fields.Integer(string='HTTP Status')
+    latency_ms = fields.Float(string='Latency (ms)', aggregator='avg')
+    offer_count = fields.Integer(string='Offers')
+    error = fields.Text()
@@ -1,14 +1,114 @@
-from odoo import models, fields
+import uuid
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+# Bands that may not cover the same day for one supplier: a band clashes
+# with itself, and 'all' clashes with every band.
+CLASHING_BANDS_SQL = "(a.band = b.band OR a.band = 'all' OR b.band = 'all')"
+
 
 class EnergyTariffRate(models.Model):
     _name = 'energy.tariff.rate'
     _description = 'Supplier Tariff Rate'
 
     name = fields.Char()
-    supplier_id = fields.Many2one('res.partner', domain=[('supplier_rank','>',0)], required=True)
+    supplier_id = fields.Many2one('res.partner', domain=[('supplier_rank','>',0)], required=True, index=True)
     start_date = fields.Date(required=True)
     end_date = fields.Date(required=True)
+    band = fields.Selection([
+        ('all', 'All Times'), ('day', 'Day'), ('night', 'Night'),
+    ], default='all', required=True, help='Time-of-use band the unit and reactive rates apply to. '
+       'Standing and capacity charges are made once per day whichever bands cover it.')
     unit_rate_p_per_kwh = fields.Float()
     standing_gbp_per_day = fields.Float()
     capacity_rate_gbp_per_kva_month = fields.Float()
-    reactive_rate_p_per_kvarh = fields.Float()
\ No newline at end of file
+    reactive_rate_p_per_kvarh = fields.Float()
+
+    _date_range_check = models.Constraint(
+        'CHECK(end_date >= start_date)',
+        'A tariff rate cannot end before it starts.',
+    )
+
+    @api.constrains('supplier_id', 'start_date', 'end_date', 'band')
+    def _check_overlap(self):
+        """Reject rates that cover a day another rate of the same supplier and band already covers.
+
+        One self-join for the whole batch, so the interval index can assume
+        at most one rate per supplier, band and day.
+        """
+        self.flush_model(['supplier_id', 'start_date', 'end_date', 'band'])
+        self.env.cr.execute(f"""
+            SELECT a.id, b.id
+              FROM energy_tariff_rate a
+              JOIN energy_tariff_rate b
+                ON b.supplier_id = a.supplier_id AND b.id != a.id
+               AND b.start_date <= a.end_date AND a.start_date <= b.end_date
+               AND {CLASHING_BANDS_SQL}
+             WHERE a.id = ANY(%s)
+             LIMIT 1
+        """, (self.ids,))
+        clash = self.env.cr.fetchone()
+        if clash:
+            rate, other = self.browse(clash)
+            raise ValidationError(_(
+                '%(rate)s (%(start)s to %(end)s) overlaps %(other)s (%(other_start)s to %(other_end)s) '
+                'for %(supplier)s.',
+                rate=rate.display_name, start=rate.start_date, end=rate.end_date,
+                other=other.display_name, other_start=other.start_date, other_end=other.end_date,
+                supplier=rate.supplier_id.display_name,
+            ))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_costs()
+        return records
+
+    def write(self, vals):
+        # costs cached for the old supplier and dates are stale too
+        spans = self._get_cost_spans() if {'supplier_id', 'start_date', 'end_date'} & set(vals) else {}
+        res = super().write(vals)
+        self._invalidate_costs(spans)
+        return res
+
+    def unlink(self):
+        self._invalidate_costs()
+        return super().unlink()
+
+    def _get_cost_spans(self):
+        """Return ``{supplier_id: (first start, last end)}`` covered by ``self``."""
+        return {
+            supplier.id: (min(rates.mapped('start_date')), max(rates.mapped('end_date')))
+            for supplier, rates in self.grouped('supplier_id').items()
+        }
+
+    def _invalidate_costs(self, spans=None):
+        """Drop cached tariff costs overlapping ``self``, plus any extra ``spans``.
+
+        The per-supplier rate indexes are not cleared: bumping the
+        suppliers' tariff_rate_version makes their cache key miss.
+        """
+        spans = dict(spans or {})
+        for supplier_id, (start, end) in self._get_cost_spans().items():
+            if supplier_id in spans:
+                start, end = min(start, spans[supplier_id][0]), max(end, spans[supplier_id][1])
+            spans[supplier_id] = (start, end)
+        if not spans:
+            return
+        # a fresh token rather than a counter, so a rolled back bump is never reused
+        self.env['res.partner'].flush_model(['tariff_rate_version'])
+        self.env.cr.execute("""
+            UPDATE res_partner SET tariff_rate_version = %s WHERE id = ANY(%s)
+        """, (uuid.uuid4().hex, list(spans)))
+        self.env['res.partner'].browse(list(spans)).invalidate_recordset(['tariff_rate_version'])
+        Cost = self.env['energy.tariff.cost'].sudo()
+        for supplier_id, (start, end) in spans.items():
+            Cost._invalidate_supplier(supplier_id, start, end)
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    tariff_rate_version = fields.Char(copy=False, readonly=True,
+                                      help='Changes whenever one of the supplier\'s tariff rates does.')
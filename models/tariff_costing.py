@@ -0,0 +1,319 @@
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, api
+from odoo.tools import ormcache
+
+from .hh_read import local_calendar, settlement_day_bounds
+
+# Reactive energy up to 33% of active energy (0.95 power factor) is not charged.
+REACTIVE_FREE_RATIO = 0.33
+# Meters whose reads are costed per series fetch.
+COSTING_METER_BATCH = 500
+
+TariffRate = namedtuple('TariffRate', [
+    'start_date', 'end_date', 'band', 'unit_rate', 'standing_rate', 'capacity_rate', 'reactive_rate',
+])
+
+
+def price_series(series, rates, capacity_kva, date_from, date_to):
+    """Cost one meter's HHSeries against date-bounded time-of-use rates.
+
+    ``rates`` is a sequence of non-overlapping ``TariffRate`` with inclusive
+    end dates. Unit and reactive rates price each interval by its UK local
+    day and band, band rates winning over 'all'. Standing and capacity
+    charges are taken once per local day in [date_from, date_to), from the
+    highest charge among the rates covering that day. Intervals no rate
+    covers are reported as ``unpriced_kwh``.
+    """
+    kwh, kvarh = series.kwh, series.kvarh
+    index = RateIndex(rates)
+    excess_kvarh = np.maximum(kvarh - REACTIVE_FREE_RATIO * kwh, 0.0)
+    applied = index.for_series(series.ts)
+    priced = applied['priced']
+    all_days = np.arange(np.datetime64(date_from, 'D'), np.datetime64(date_to, 'D'))
+    standing, capacity = index.daily_charges(all_days)
+    cost = {
+        'energy_cost': kwh[priced] @ applied['unit_rate'][priced] / 100.0,
+        'reactive_cost': excess_kvarh[priced] @ applied['reactive_rate'][priced] / 100.0,
+        'standing_cost': standing.sum(),
+        'capacity_cost': capacity.sum() * (capacity_kva or 0.0) * 12 / 365.0,
+    }
+    cost = {key: float(value) for key, value in cost.items()}
+    cost['kwh'] = float(kwh.sum())
+    cost['unpriced_kwh'] = float(kwh[~priced].sum())
+    cost['total_cost'] = cost['energy_cost'] + cost['reactive_cost'] + cost['standing_cost'] + cost['capacity_cost']
+    return cost
+
+
+class RateIndex:
+    """Sorted, non-overlapping tariff rates of one supplier, per band.
+
+    The overlap constraint on energy.tariff.rate guarantees at most one rate
+    per band and day, so plain sorted start/end arrays answer point lookups
+    with a binary search; no interval tree is needed.
+    """
+
+    def __init__(self, rates):
+        self.bands = {}
+        for band in ('all', 'day', 'night'):
+            band_rates = sorted((r for r in rates if r.band == band), key=lambda r: r.start_date)
+            self.bands[band] = (
+                np.array([r.start_date for r in band_rates], dtype='datetime64[D]'),
+                np.array([r.end_date for r in band_rates], dtype='datetime64[D]'),
+                tuple(band_rates),
+            )
+
+    def _positions(self, band, days):
+        """Index into ``band``'s rates of the rate covering each of ``days``, -1 where none does."""
+        starts, ends, rates = self.bands[band]
+        if not rates:
+            return np.full(days.shape, -1)
+        pos = np.searchsorted(starts, days, side='right') - 1
+        covered = (pos >= 0) & (days <= ends[np.maximum(pos, 0)])
+        return np.where(covered, pos, -1)
+
+    def lookup(self, day, band='all'):
+        """The rate applying on ``day`` to ``band`` intervals ('day', 'night' or 'all'), or None."""
+        days = np.array([day], dtype='datetime64[D]')
+        for candidate in dict.fromkeys((band, 'all')):
+            pos = self._positions(candidate, days)[0]
+            if pos >= 0:
+                return self.bands[candidate][2][pos]
+        return None
+
+    def between(self, date_from, date_to):
+        """Rates of any band covering a day in [date_from, date_to), ordered by start date."""
+        lo, hi = np.datetime64(date_from, 'D'), np.datetime64(date_to, 'D')
+        found = []
+        for starts, ends, rates in self.bands.values():
+            # ends are sorted too since a band's rates never overlap
+            first = np.searchsorted(ends, lo, side='left')
+            last = np.searchsorted(starts, hi, side='left')
+            found.extend(rates[first:last])
+        return sorted(found, key=lambda r: r.start_date)
+
+    def for_series(self, ts):
+        """Rates applying to each UTC ``datetime64`` in ``ts``, as arrays aligned with it.
+
+        Returns a dict of ``unit_rate``, ``reactive_rate``, ``standing_rate``
+        and ``capacity_rate`` float arrays (NaN where no rate applies) plus a
+        boolean ``priced`` mask. Band-specific rates win over 'all'.
+        """
+        local, hour, is_night, is_weekend = local_calendar(ts)
+        days = local.astype('datetime64[D]')
+        keys = ('unit_rate', 'reactive_rate', 'standing_rate', 'capacity_rate')
+        result = {key: np.full(ts.shape, np.nan) for key in keys}
+        priced = np.zeros(ts.shape, dtype=bool)
+        for band, mask in (('night', is_night), ('day', ~is_night), ('all', np.ones(ts.shape, dtype=bool))):
+            rates = self.bands[band][2]
+            if not rates:
+                continue
+            pos = self._positions(band, days)
+            hit = mask & ~priced & (pos >= 0)
+            for key in keys:
+                values = np.array([getattr(r, key) or 0.0 for r in rates])
+                result[key][hit] = values[pos[hit]]
+            priced |= hit
+        result['priced'] = priced
+        return result
+
+    def daily_charges(self, days):
+        """Standing and capacity rate of each local day in ``days``, 0 where no rate covers it.
+
+        A day is charged once: when a day and a night rate both cover it,
+        the higher of their charges applies rather than their sum.
+        """
+        standing, capacity = np.zeros(days.shape), np.zeros(days.shape)
+        for band in self.bands:
+            rates = self.bands[band][2]
+            if not rates:
+                continue
+            pos = self._positions(band, days)
+            hit = pos >= 0
+            standing[hit] = np.maximum(standing[hit], np.array([r.standing_rate or 0.0 for r in rates])[pos[hit]])
+            capacity[hit] = np.maximum(capacity[hit], np.array([r.capacity_rate or 0.0 for r in rates])[pos[hit]])
+        return standing, capacity
+
+
+def day_range_utc(date_from, date_to):
+    """UTC bounds covering the UK local days in [date_from, date_to)."""
+    return settlement_day_bounds(date_from)[0], settlement_day_bounds(date_to)[0]
+
+
+class EnergyTariffCost(models.Model):
+    """Cached cost of a meter's HH reads against a supplier's tariff rates."""
+    _name = 'energy.tariff.cost'
+    _description = 'Tariff Cost Cache'
+
+    meter_product_id = fields.Many2one('product.product', string='Meter', required=True, index=True, ondelete='cascade')
+    supplier_id = fields.Many2one('res.partner', string='Supplier', required=True, index=True, ondelete='cascade')
+    date_from = fields.Date(required=True)
+    date_to = fields.Date(required=True, help='Exclusive end of the costed period.')
+    kwh = fields.Float(string='kWh')
+    unpriced_kwh = fields.Float(string='Unpriced kWh')
+    energy_cost = fields.Float()
+    reactive_cost = fields.Float()
+    standing_cost = fields.Float()
+    capacity_cost = fields.Float()
+    total_cost = fields.Float()
+
+    _meter_supplier_period_unique = models.Constraint(
+        'UNIQUE(meter_product_id, supplier_id, date_from, date_to)',
+        'Only one cached cost is allowed per meter, supplier and period.',
+    )
+
+    @api.model
+    def _get_rates(self, supplier_id, date_from, date_to):
+        return self.env['energy.tariff.rate']._get_rate_index(supplier_id).between(date_from, date_to)
+
+    @api.model
+    def _get_costs(self, meter_ids, supplier_id, date_from, date_to):
+        """Return ``{meter_id: cost dict}`` for [date_from, date_to), costing only uncached meters."""
+        cost_fields = ['kwh', 'unpriced_kwh', 'energy_cost', 'reactive_cost', 'standing_cost', 'capacity_cost', 'total_cost']
+        cached = self.search_read([
+            ('meter_product_id', 'in', list(meter_ids)),
+            ('supplier_id', '=', supplier_id),
+            ('date_from', '=', date_from),
+            ('date_to', '=', date_to),
+        ], ['meter_product_id'] + cost_fields)
+        result = {row['meter_product_id'][0]: {f: row[f] for f in cost_fields} for row in cached}
+        missing = [m for m in meter_ids if m not in result]
+        if not missing:
+            return result
+
+        rates = self._get_rates(supplier_id, date_from, date_to)
+        kva = {m['id']: m['kva'] for m in self.env['product.product'].browse(missing).read(['kva'])}
+        dt_from, dt_to = day_range_utc(date_from, date_to)
+        HHRead = self.env['energy.hh.read']
+        vals_list = []
+        for start in range(0, len(missing), COSTING_METER_BATCH):
+            batch = missing[start:start + COSTING_METER_BATCH]
+            for meter_id, series in HHRead._read_series(batch, dt_from, dt_to).items():
+                cost = price_series(series, rates, kva.get(meter_id), date_from, date_to)
+                result[meter_id] = cost
+                vals_list.append(dict(cost, meter_product_id=meter_id, supplier_id=supplier_id,
+                                      date_from=date_from, date_to=date_to))
+        self.create(vals_list)
+        return result
+
+    @api.model
+    def _invalidate_supplier(self, supplier_id, date_from, date_to):
+        self.search([
+            ('supplier_id', '=', supplier_id),
+            ('date_from', '<=', date_to),
+            ('date_to', '>', date_from),
+        ]).unlink()
+
+    @api.model
+    def _invalidate_meters(self, meter_ids, date_from, date_to):
+        self.search([
+            ('meter_product_id', 'in', list(meter_ids)),
+            ('date_from', '<=', date_to),
+            ('date_to', '>', date_from),
+        ]).unlink()
+
+
+class EnergyTariffRate(models.Model):
+    _inherit = 'energy.tariff.rate'
+
+    @api.model
+    def _get_rate_index(self, supplier_id):
+        """Cached RateIndex of a supplier's rates, rebuilt whenever one of them changes.
+
+        The cache key carries the supplier's tariff_rate_version, bumped on
+        every rate change, so a change in any worker is seen without
+        clearing the registry caches.
+        """
+        version = self.env['res.partner'].sudo().browse(supplier_id).tariff_rate_version
+        return self._get_rate_index_version(supplier_id, version)
+
+    @api.model
+    @ormcache('supplier_id', 'version')
+    def _get_rate_index_version(self, supplier_id, version):
+        rates = self.sudo().search_read([('supplier_id', '=', supplier_id)], [
+            'start_date', 'end_date', 'band', 'unit_rate_p_per_kwh', 'standing_gbp_per_day',
+            'capacity_rate_gbp_per_kva_month', 'reactive_rate_p_per_kvarh',
+        ])
+        return RateIndex([
+            TariffRate(r['start_date'], r['end_date'], r['band'], r['unit_rate_p_per_kwh'], r['standing_gbp_per_day'],
+                       r['capacity_rate_gbp_per_kva_month'], r['reactive_rate_p_per_kvarh'])
+            for r in rates
+        ])
+
+    @api.model
+    def _get_rate(self, supplier_id, day, band='all'):
+        """The TariffRate applying to ``band`` intervals of ``supplier_id`` on ``day``, or None."""
+        return self._get_rate_index(supplier_id).lookup(day, band)
+
+    @api.model
+    def _get_rates_for_series(self, supplier_id, ts):
+        """Rate arrays aligned with a HHSeries' ``ts``; see RateIndex.for_series."""
+        return self._get_rate_index(supplier_id).for_series(ts)
+
+
+class EnergyHHRead(models.Model):
+    _inherit = 'energy.hh.read'
+
+    @api.model
+    def _on_reads_changed(self, meter_ids, dt_from, dt_to):
+        super()._on_reads_changed(meter_ids, dt_from, dt_to)
+        # a UTC range can touch the UK local day either side
+        self.env['energy.tariff.cost'].sudo()._invalidate_meters(
+            meter_ids, dt_from.date() - timedelta(days=1), dt_to.date() + timedelta(days=1))
+
+
+class SupplierPriceResponse(models.Model):
+    _inherit = 'supplier.price.response'
+
+    def action_cost_against_hh(self):
+        """Cost each response line against the meter's last 12 months of HH reads.
+
+        Suppliers with tariff rates are costed through the cached
+        energy.tariff.cost engine, band by band. Meters the rates do not
+        fully price, and suppliers without rates, fall back to a flat rate
+        built from the offer line's unit, standing and kVA prices.
+        """
+        date_to = fields.Date.context_today(self).replace(day=1)
+        date_from = date_to - relativedelta(months=12)
+        Cost = self.env['energy.tariff.cost']
+        RateModel = self.env['energy.tariff.rate']
+        flat_lines = self.env['supplier.price.response.line']
+        for supplier, responses in self.grouped('partner_id').items():
+            lines = responses.line_ids.filtered(lambda l: l.request_line_id.product_id)
+            if not RateModel._get_rate_index(supplier.id).between(date_from, date_to):
+                flat_lines |= lines
+                continue
+            costs = Cost._get_costs(lines.request_line_id.product_id.ids, supplier.id, date_from, date_to)
+            for line in lines:
+                cost = costs.get(line.request_line_id.product_id.id)
+                if cost and cost['kwh'] and not cost['unpriced_kwh']:
+                    line.hh_annual_cost = cost['total_cost']
+                else:
+                    flat_lines |= line
+        flat_lines._cost_flat_against_hh(date_from, date_to)
+
+
+class SupplierPriceResponseLine(models.Model):
+    _inherit = 'supplier.price.response.line'
+
+    hh_annual_cost = fields.Monetary(string='Annual Cost (HH)', currency_field='currency_id',
+                                     help='Supplier tariff rates, or the offer rates, applied to the last 12 months of half-hourly reads.')
+
+    def _cost_flat_against_hh(self, date_from, date_to):
+        """Cost each line's own offer rates, as one 'all' band rate, against its meter's HH reads."""
+        meters = self.request_line_id.product_id
+        dt_from, dt_to = day_range_utc(date_from, date_to)
+        series_by_meter = self.env['energy.hh.read']._read_series(meters.ids, dt_from, dt_to)
+        for line in self:
+            meter = line.request_line_id.product_id
+            series = series_by_meter.get(meter.id)
+            if series is None or not series.ts.size:
+                line.hh_annual_cost = 0.0
+                continue
+            rate = TariffRate(date_from, date_to - timedelta(days=1), 'all', line.unit_rate_p_per_kwh,
+                              line.standing_charge_gbp_per_day, line.kva_price, 0.0)
+            line.hh_annual_cost = price_series(series, [rate], meter.kva, date_from, date_to)['total_cost']
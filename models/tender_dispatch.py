@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+from .batching import iter_cron_batches
+
+# Mails handed to one mail.mail.send() call, which opens one SMTP connection per server.
+TENDER_MAILS_PER_CONNECTION = 50
+# Default cap on tender mails sent per cron run (energy_broker_uk.tender_send_limit).
+TENDER_SEND_LIMIT = 500
+TENDER_MAX_ATTEMPTS = 5
+# Delay before the first retry, doubled for each further attempt.
+TENDER_RETRY_DELAY = timedelta(minutes=5)
+
+
+class SupplierTenderDispatch(models.Model):
+    """One tender email to one supplier, with its delivery status and retries."""
+    _name = 'supplier.tender.dispatch'
+    _description = 'Tender Email Dispatch'
+    _order = 'id desc'
+
+    request_id = fields.Many2one('supplier.price.request', required=True, index=True, ondelete='cascade')
+    partner_id = fields.Many2one('res.partner', string='Supplier', required=True, ondelete='cascade')
+    email_to = fields.Char(required=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Tender File', ondelete='set null')
+    mail_id = fields.Many2one('mail.mail', string='Email', ondelete='set null')
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], default='queued', required=True, index=True)
+    attempts = fields.Integer(default=0)
+    next_attempt_date = fields.Datetime(index=True)
+    sent_date = fields.Datetime()
+    last_error = fields.Text()
+
+    @api.model
+    def _get_send_limit(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        return int(ICP.get_param('energy_broker_uk.tender_send_limit') or TENDER_SEND_LIMIT)
+
+    def _due_domain(self):
+        return [
+            ('state', '=', 'queued'),
+            '|', ('next_attempt_date', '=', False), ('next_attempt_date', '<=', fields.Datetime.now()),
+        ]
+
+    def cron_send_tenders(self):
+        due = self.search(self._due_domain(), order='next_attempt_date, id', limit=self._get_send_limit())
+        for batch in iter_cron_batches(due, TENDER_MAILS_PER_CONNECTION):
+            batch._send()
+        if self.search_count(self._due_domain(), limit=1):
+            self.env.ref('energy_broker_uk.ir_cron_send_tenders')._trigger()
+        else:
+            # wake up for the earliest pending retry
+            retry = self.search([('state', '=', 'queued')], order='next_attempt_date', limit=1)
+            if retry.next_attempt_date:
+                self.env.ref('energy_broker_uk.ir_cron_send_tenders')._trigger(retry.next_attempt_date)
+
+    def action_retry(self):
+        self.write({'state': 'queued', 'attempts': 0, 'next_attempt_date': False})
+        self.env.ref('energy_broker_uk.ir_cron_send_tenders')._trigger()
+
+    def _send(self):
+        """Deliver ``self`` over one SMTP session per mail server and record the outcome."""
+        to_create = self.filtered(lambda d: not d.mail_id)
+        mails = self.env['mail.mail'].sudo().create([{
+            'subject': _('Tender Request: %s') % (dispatch.request_id.name,),
+            'body_html': _('<p>Please find attached the meter list for tendering.</p>'),
+            'email_to': dispatch.email_to,
+            'model': dispatch.request_id._name,
+            'res_id': dispatch.request_id.id,
+            'attachment_ids': [(4, dispatch.attachment_id.id)] if dispatch.attachment_id else [],
+            'auto_delete': False,
+        } for dispatch in to_create])
+        for dispatch, mail in zip(to_create, mails):
+            dispatch.mail_id = mail
+        retried = (self - to_create).mail_id
+        retried.write({'state': 'outgoing', 'failure_reason': False})
+        self.mail_id.send(auto_commit=False, raise_exception=False)
+
+        now = fields.Datetime.now()
+        sent = self.filtered(lambda d: d.mail_id.state == 'sent')
+        sent.write({'state': 'sent', 'sent_date': now, 'last_error': False})
+        for dispatch in self - sent:
+            attempts = dispatch.attempts + 1
+            vals = {'attempts': attempts, 'last_error': dispatch.mail_id.failure_reason or _('Unknown delivery error')}
+            if attempts >= TENDER_MAX_ATTEMPTS:
+                vals['state'] = 'failed'
+            else:
+                vals['next_attempt_date'] = now + TENDER_RETRY_DELAY * 2 ** (attempts - 1)
+            dispatch.write(vals)
+
+
+class SupplierPriceRequest(models.Model):
+    _inherit = 'supplier.price.request'
+
+    tender_dispatch_ids = fields.One2many('supplier.tender.dispatch', 'request_id', string='Tender Dispatch Log')
+
+    def action_send_tender_emails(self):
+        """Queue one tender email per supplier; the tender cron delivers them in batches."""
+        if self.filtered(lambda r: not r.supplier_ids):
+            raise ValidationError(_('Please select at least one supplier.'))
+        vals_list, skipped = [], []
+        for rec in self:
+            # one tender file per request and template, shared by the suppliers using it
+            for template, suppliers in rec.supplier_ids.grouped('tender_template_id').items():
+                attachment = rec._export_tender(template)
+                for supplier in suppliers:
+                    email = supplier.tender_email or supplier.email
+                    if not email:
+                        skipped.append(supplier.display_name)
+                        continue
+                    vals_list.append({
+                        'request_id': rec.id,
+                        'partner_id': supplier.id,
+                        'email_to': email,
+                        'attachment_id': attachment.id,
+                    })
+        self.env['supplier.tender.dispatch'].create(vals_list)
+        self.env.ref('energy_broker_uk.ir_cron_send_tenders')._trigger()
+        message = _('%s tender email(s) queued.') % len(vals_list)
+        if skipped:
+            message += ' ' + _('No email address for: %s') % ', '.join(sorted(set(skipped)))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'warning' if skipped else 'info',
+                'message': message,
+            },
+        }
@@ -0,0 +1,159 @@
+import csv
+import io
+import tempfile
+
+import xlsxwriter
+
+from odoo import models, fields, _
+from odoo.tools import split_every
+
+# Request lines read, written and evicted from the cache per chunk.
+TENDER_EXPORT_CHUNK = 5000
+# Rows written to a spooled export file before it moves to disk.
+TENDER_SPOOL_SIZE = 8 * 1024 * 1024
+
+TENDER_COLUMNS = [
+    ('mpan_mprn', 'MPAN/MPRN'),
+    ('annual_usage_kwh', 'Annual Usage (kWh)'),
+    ('current_supplier', 'Current Supplier'),
+    ('contract_end_date', 'Contract End'),
+    ('meter_type', 'Meter Type'),
+    ('supply_address', 'Supply Address'),
+    ('meter_code', 'Meter Reference'),
+    ('customer', 'Customer'),
+    ('request', 'Tender Reference'),
+]
+# Layout used when a supplier has no tender template.
+DEFAULT_TENDER_COLUMNS = ['mpan_mprn', 'annual_usage_kwh', 'current_supplier', 'contract_end_date', 'meter_type', 'supply_address']
+
+LINE_FIELDS = ['mpan_mprn', 'annual_usage_kwh', 'current_supplier_id', 'contract_end_date', 'meter_type', 'supply_address', 'product_id']
+
+
+class _CsvSink:
+    def __init__(self, fileobj, delimiter):
+        self.text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='', write_through=True)
+        self.writer = csv.writer(self.text, delimiter=delimiter)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.text.flush()
+        self.text.detach()
+
+
+class _XlsxSink:
+    def __init__(self, fileobj):
+        # constant_memory flushes each row to a temp file as soon as the next one starts
+        self.workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True, 'in_memory': False})
+        self.sheet = self.workbook.add_worksheet(_('Meters'))
+        self.row = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.write_row(self.row, 0, row)
+            self.row += 1
+
+    def close(self):
+        self.workbook.close()
+
+
+class SupplierTenderTemplate(models.Model):
+    _name = 'supplier.tender.template'
+    _description = 'Supplier Tender File Template'
+
+    name = fields.Char(required=True)
+    file_format = fields.Selection([('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', required=True)
+    csv_delimiter = fields.Char(default=',', size=1)
+    include_header = fields.Boolean(default=True)
+    column_ids = fields.One2many('supplier.tender.template.column', 'template_id', string='Columns', copy=True)
+
+    def _get_columns(self):
+        """Return ``[(key, header)]`` for this template, or the default layout when empty."""
+        if self and self.column_ids:
+            return [(c.field_key, c.header or dict(TENDER_COLUMNS)[c.field_key]) for c in self.column_ids]
+        return [(key, dict(TENDER_COLUMNS)[key]) for key in DEFAULT_TENDER_COLUMNS]
+
+
+class SupplierTenderTemplateColumn(models.Model):
+    _name = 'supplier.tender.template.column'
+    _description = 'Supplier Tender Template Column'
+    _order = 'sequence, id'
+
+    template_id = fields.Many2one('supplier.tender.template', required=True, ondelete='cascade')
+    sequence = fields.Integer(default=10)
+    field_key = fields.Selection(TENDER_COLUMNS, string='Value', required=True)
+    header = fields.Char(help='Column heading in the file; defaults to the value name.')
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    tender_template_id = fields.Many2one('supplier.tender.template', string='Tender File Template')
+
+
+class SupplierPriceRequest(models.Model):
+    _inherit = 'supplier.price.request'
+
+    def _iter_tender_rows(self, columns):
+        """Yield lists of export rows, ``TENDER_EXPORT_CHUNK`` request lines at a time.
+
+        Lines are read without display names and the related suppliers and
+        meters are resolved with one read per chunk, then evicted from the
+        cache so memory stays flat however large the tender is.
+        """
+        self.ensure_one()
+        Line = self.env['supplier.price.request.line']
+        meter_types = dict(Line._fields['meter_type']._description_selection(self.env))
+        fixed = {'customer': self.partner_id.display_name or '', 'request': self.name or ''}
+        keys = [key for key, header in columns]
+        line_ids = Line.search([('request_id', '=', self.id)], order='id').ids
+        for chunk in split_every(TENDER_EXPORT_CHUNK, line_ids):
+            rows = Line.browse(chunk).read(LINE_FIELDS, load=None)
+            suppliers = {p['id']: p['display_name'] for p in self.env['res.partner'].browse(
+                {r['current_supplier_id'] for r in rows if r['current_supplier_id']}).read(['display_name'])}
+            meters = {p['id']: p['default_code'] for p in self.env['product.product'].browse(
+                {r['product_id'] for r in rows if r['product_id']}).read(['default_code'])}
+            out = []
+            for row in rows:
+                values = dict(
+                    fixed,
+                    mpan_mprn=row['mpan_mprn'] or '',
+                    annual_usage_kwh=row['annual_usage_kwh'] or 0.0,
+                    current_supplier=suppliers.get(row['current_supplier_id'], ''),
+                    contract_end_date=fields.Date.to_string(row['contract_end_date']) or '',
+                    meter_type=meter_types.get(row['meter_type'], ''),
+                    supply_address=row['supply_address'] or '',
+                    meter_code=meters.get(row['product_id']) or '',
+                )
+                out.append([values[key] for key in keys])
+            yield out
+            self.env.invalidate_all()
+
+    def _export_tender(self, template):
+        """Write this request's tender file in ``template``'s layout and return it as an attachment."""
+        self.ensure_one()
+        columns = template._get_columns()
+        file_format = template.file_format or 'csv'
+        with tempfile.SpooledTemporaryFile(max_size=TENDER_SPOOL_SIZE) as spool:
+            if file_format == 'xlsx':
+                sink = _XlsxSink(spool)
+            else:
+                sink = _CsvSink(spool, template.csv_delimiter or ',')
+            if not template or template.include_header:
+                sink.write_rows([[header for key, header in columns]])
+            for rows in self._iter_tender_rows(columns):
+                sink.write_rows(rows)
+            sink.close()
+            spool.seek(0)
+            raw = spool.read()
+        suffix = f"_{template.name}" if template else ''
+        return self.env['ir.attachment'].create({
+            'name': f"tender_{self.name}{suffix}.{file_format}",
+            'type': 'binary',
+            'raw': raw,
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': 'text/csv' if file_format == 'csv'
+                else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        })